@@ -47,6 +47,13 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
+def get_user_from_token(token: str, db: Session) -> Optional[User]:
+    payload = decode_token(token)
+    if payload is None or payload.get("sub") is None:
+        return None
+    return db.query(User).filter(User.id == payload["sub"]).first()
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -0,0 +1,313 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from backend.catalog import FragranceRecord, get_catalog
+from backend.schemas import AutocompleteResponse, AutocompleteSuggestion
+
+COMPACT_FRACTION = float(os.environ.get("SCENT_AUTOCOMPLETE_COMPACT_FRACTION", 0.05))
+WIDE_RANGE = 4096
+MEMO_SIZE = 4096
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+TERM_END = "\U0010ffff"
+
+
+def normalize_text(text: str) -> str:
+    text = text.lower()
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(TOKEN_PATTERN.findall(text))
+
+
+def word_suffixes(text: str) -> List[str]:
+    normalized = normalize_text(text)
+    if not normalized:
+        return []
+    return [normalized] + [normalized[m.start() + 1:] for m in re.finditer(" ", normalized)]
+
+
+class PrefixIndex:
+    def __init__(self, keys: List[str], terms: List[Iterable[str]], ratings: np.ndarray, reviews: np.ndarray):
+        order = np.lexsort((-reviews, -ratings))
+        self.keys = [keys[i] for i in order.tolist()]
+        self.ratings = ratings[order]
+        self.reviews = reviews[order]
+        
+        term_codes: Dict[str, int] = {}
+        codes, entities = [], []
+        for entity, entity_terms in enumerate(terms[i] for i in order.tolist()):
+            for term in set(entity_terms):
+                codes.append(term_codes.setdefault(term, len(term_codes)))
+                entities.append(entity)
+        self.terms = sorted(term_codes)
+        remap = np.empty(len(term_codes), dtype=np.int32)
+        remap[[term_codes[term] for term in self.terms]] = np.arange(len(self.terms), dtype=np.int32)
+        codes = remap[np.array(codes, dtype=np.int32)]
+        entities = np.array(entities, dtype=np.int32)
+        self.postings = entities[np.lexsort((entities, codes))]
+        self.starts = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(self.terms)))]
+        self._memo: Dict[Tuple[str, int], np.ndarray] = {}
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        lo = bisect_left(self.terms, prefix)
+        hi = bisect_left(self.terms, prefix + TERM_END, lo)
+        return int(self.starts[lo]), int(self.starts[hi])
+    
+    def top(self, prefix: str, k: int) -> np.ndarray:
+        start, end = self._range(prefix)
+        if end - start <= WIDE_RANGE:
+            return np.unique(self.postings[start:end])[:k]
+        memo = self._memo.get((prefix, k))
+        if memo is None:
+            matches = self.postings[start:end]
+            if len(matches) > 4 * k:
+                matches = np.partition(matches, 4 * k)[:4 * k]
+            memo = np.unique(matches)[:k]
+            if len(memo) < k:
+                memo = np.unique(self.postings[start:end])[:k]
+            if len(self._memo) >= MEMO_SIZE:
+                self._memo.clear()
+            self._memo[(prefix, k)] = memo
+        return memo
+    
+    def sort_key(self, entity: int) -> Tuple[float, int]:
+        return -float(self.ratings[entity]), -int(self.reviews[entity])
+
+
+def fragrance_index(records: Iterable[FragranceRecord]) -> PrefixIndex:
+    records = list(records)
+    return PrefixIndex(
+        [r.id for r in records],
+        [word_suffixes(r.name) + [normalize_text(f"{r.brand} {r.name}")] for r in records],
+        np.array([r.avg_rating for r in records], dtype=np.float64),
+        np.array([r.review_count for r in records], dtype=np.int64),
+    )
+
+
+class GroupStats:
+    def __init__(self):
+        self.totals: Dict[str, List[float]] = {}
+    
+    def copy(self) -> "GroupStats":
+        stats = GroupStats()
+        stats.totals = {key: list(totals) for key, totals in self.totals.items()}
+        return stats
+    
+    def add(self, key: str, record: FragranceRecord, sign: int = 1):
+        totals = self.totals.setdefault(key, [0, 0.0, 0])
+        totals[0] += sign
+        totals[1] += sign * record.avg_rating
+        totals[2] += sign * record.review_count
+        if totals[0] <= 0:
+            del self.totals[key]
+    
+    def index(self) -> PrefixIndex:
+        keys = list(self.totals)
+        counts = np.array([self.totals[k][0] for k in keys], dtype=np.float64)
+        ratings = np.array([self.totals[k][1] for k in keys], dtype=np.float64) / np.maximum(counts, 1)
+        reviews = np.array([self.totals[k][2] for k in keys], dtype=np.int64)
+        return PrefixIndex(keys, [word_suffixes(k) for k in keys], np.round(ratings, 2), reviews)
+
+
+def record_notes(record: FragranceRecord) -> Set[str]:
+    return {note.strip() for note in record.top_notes + record.mid_notes + record.base_notes if note.strip()}
+
+
+class AutocompleteIndex:
+    def __init__(self, version: int, records: Dict[str, FragranceRecord]):
+        self.version = version
+        self.records = records
+        self.base = fragrance_index(records.values())
+        self.delta: Optional[PrefixIndex] = None
+        self.stale: Set[str] = set()
+        self.brand_stats = GroupStats()
+        self.note_stats = GroupStats()
+        for record in records.values():
+            self._count(record, 1)
+        self.brands = self.brand_stats.index()
+        self.notes = self.note_stats.index()
+    
+    def _count(self, record: FragranceRecord, sign: int):
+        if record.brand:
+            self.brand_stats.add(record.brand, record, sign)
+        for note in record_notes(record):
+            self.note_stats.add(note, record, sign)
+    
+    def apply(self, version: int, records: Dict[str, FragranceRecord], changed: Set[str]) -> "AutocompleteIndex":
+        updated = AutocompleteIndex.__new__(AutocompleteIndex)
+        updated.version = version
+        updated.records = records
+        updated.base = self.base
+        updated.stale = self.stale | changed
+        updated.brand_stats = self.brand_stats.copy()
+        updated.note_stats = self.note_stats.copy()
+        for fragrance_id in changed:
+            previous = self.records.get(fragrance_id)
+            if previous is not None:
+                updated._count(previous, -1)
+            updated._count(records[fragrance_id], 1)
+        updated.delta = fragrance_index(records[i] for i in updated.stale)
+        updated.brands = updated.brand_stats.index()
+        updated.notes = updated.note_stats.index()
+        return updated
+    
+    @property
+    def needs_compaction(self) -> bool:
+        return len(self.stale) > COMPACT_FRACTION * max(len(self.base), 1)
+    
+    def _fragrances(self, prefix: str, limit: int) -> List[AutocompleteSuggestion]:
+        k = 2 * limit
+        while True:
+            entities = self.base.top(prefix, k)
+            candidates = [
+                (self.base.sort_key(e), self.base.keys[e]) for e in entities.tolist()
+                if self.base.keys[e] not in self.stale
+            ]
+            if len(candidates) >= limit or len(entities) < k:
+                break
+            k *= 4
+        if self.delta is not None:
+            candidates += [(self.delta.sort_key(e), self.delta.keys[e]) for e in self.delta.top(prefix, limit).tolist()]
+            candidates.sort()
+        return [self._fragrance_suggestion(self.records[fragrance_id]) for _, fragrance_id in candidates[:limit]]
+    
+    def _fragrance_suggestion(self, record: FragranceRecord) -> AutocompleteSuggestion:
+        return AutocompleteSuggestion(
+            type="fragrance",
+            text=record.name,
+            fragrance_id=record.id,
+            brand=record.brand,
+            avg_rating=record.avg_rating,
+            review_count=record.review_count
+        )
+    
+    def _group(self, index: PrefixIndex, kind: str, prefix: str, limit: int) -> List[AutocompleteSuggestion]:
+        return [
+            AutocompleteSuggestion(
+                type=kind,
+                text=index.keys[e],
+                avg_rating=float(index.ratings[e]),
+                review_count=int(index.reviews[e])
+            )
+            for e in index.top(prefix, limit).tolist()
+        ]
+    
+    def suggest(self, q: str, limit: int) -> AutocompleteResponse:
+        prefix = normalize_text(q)
+        if not prefix:
+            return AutocompleteResponse(query=q)
+        return AutocompleteResponse(
+            query=q,
+            fragrances=self._fragrances(prefix, limit),
+            brands=self._group(self.brands, "brand", prefix, limit),
+            notes=self._group(self.notes, "note", prefix, limit)
+        )
+    
+    def metrics(self) -> dict:
+        return {
+            "version": self.version,
+            "fragrances": len(self.base),
+            "terms": len(self.base.terms),
+            "delta": len(self.delta) if self.delta is not None else 0,
+            "brands": len(self.brands),
+            "notes": len(self.notes),
+        }
+
+
+class Autocomplete:
+    def __init__(self):
+        self._index: Optional[AutocompleteIndex] = None
+        self._lock = threading.RLock()
+        self._rebuilding: Optional[threading.Thread] = None
+        self.full_builds = 0
+        self.incremental_builds = 0
+        self.last_build_seconds: Optional[float] = None
+    
+    def _build(self, version: int, records: Dict[str, FragranceRecord]) -> AutocompleteIndex:
+        start = time.perf_counter()
+        index = AutocompleteIndex(version, records)
+        with self._lock:
+            current = self._index
+            if current is not None and current.version > version:
+                changed = get_catalog().changes_since(version)
+                if changed is not None and changed <= current.records.keys():
+                    index = index.apply(current.version, current.records, changed)
+            if current is None or index.version > current.version or (
+                index.version == current.version and len(index.stale) < len(current.stale)
+            ):
+                self._index = index
+            self.full_builds += 1
+            self.last_build_seconds = time.perf_counter() - start
+        return index
+    
+    def _rebuild(self, version: int, records: Dict[str, FragranceRecord]):
+        try:
+            self._build(version, records)
+        except Exception as e:
+            print(f"Warning: Autocomplete index rebuild failed: {e}")
+        finally:
+            self._rebuilding = None
+    
+    def _start_rebuild(self, version: int, records: Dict[str, FragranceRecord]):
+        if self._rebuilding is None:
+            self._rebuilding = threading.Thread(
+                target=self._rebuild, args=(version, records), name="autocomplete-index", daemon=True
+            )
+            self._rebuilding.start()
+    
+    def warm(self, db: Session):
+        version, records = get_catalog().snapshot(db)
+        with self._lock:
+            if self._index is None:
+                self._start_rebuild(version, records)
+    
+    def current(self, db: Session) -> AutocompleteIndex:
+        catalog = get_catalog()
+        version, records = catalog.snapshot(db)
+        index = self._index
+        if index is None:
+            rebuilding = self._rebuilding
+            if rebuilding is not None:
+                rebuilding.join()
+            with self._lock:
+                index = self._index if self._index is not None else self._build(version, records)
+        if index.version >= version:
+            return index
+        with self._lock:
+            index = self._index
+            if index.version >= version:
+                return index
+            changed = catalog.changes_since(index.version)
+            if changed is None or not changed <= records.keys():
+                self._start_rebuild(version, records)
+                return index
+            index = index.apply(version, records, changed)
+            self.incremental_builds += 1
+            self._index = index
+            if index.needs_compaction:
+                self._start_rebuild(version, records)
+        return index
+    
+    def metrics(self) -> dict:
+        index = self._index
+        metrics = index.metrics() if index is not None else {"version": None}
+        metrics["full_builds"] = self.full_builds
+        metrics["incremental_builds"] = self.incremental_builds
+        metrics["rebuilding"] = self._rebuilding is not None
+        metrics["last_build_seconds"] = self.last_build_seconds
+        return metrics
+
+
+autocomplete = Autocomplete()
+
+
+def get_autocomplete() -> Autocomplete:
+    return autocomplete
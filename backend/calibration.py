@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.models import DeviceCalibration
+
+VECTOR_SIZE = 16
+CHECK_INTERVAL_SECONDS = float(os.environ.get("SCENT_CALIBRATION_CHECK_SECONDS", 30))
+
+
+class CalibrationState(NamedTuple):
+    index: Dict[str, int]
+    baseline: np.ndarray
+    gain: np.ndarray
+    temperature_coeff: np.ndarray
+    humidity_coeff: np.ndarray
+    reference_temperature: np.ndarray
+    reference_humidity: np.ndarray
+
+
+def _fit(values: Optional[Sequence[float]], vector_size: int, fill: float) -> np.ndarray:
+    row = np.full(vector_size, fill, dtype=np.float32)
+    if values:
+        values = np.asarray(values, dtype=np.float32)[:vector_size]
+        row[:len(values)] = values
+    return row
+
+
+def build_state(profiles: Sequence[DeviceCalibration], vector_size: int = VECTOR_SIZE) -> CalibrationState:
+    count = len(profiles) + 1
+    baseline = np.zeros((count, vector_size), dtype=np.float32)
+    gain = np.ones((count, vector_size), dtype=np.float32)
+    temperature_coeff = np.zeros((count, vector_size), dtype=np.float32)
+    humidity_coeff = np.zeros((count, vector_size), dtype=np.float32)
+    reference_temperature = np.zeros(count, dtype=np.float32)
+    reference_humidity = np.zeros(count, dtype=np.float32)
+    
+    index = {}
+    for row, profile in enumerate(profiles, start=1):
+        index[profile.device_id] = row
+        baseline[row] = _fit(profile.baseline, vector_size, 0.0)
+        gain[row] = _fit(profile.gain, vector_size, 1.0)
+        temperature_coeff[row] = _fit(profile.temperature_coeff, vector_size, 0.0)
+        humidity_coeff[row] = _fit(profile.humidity_coeff, vector_size, 0.0)
+        reference_temperature[row] = profile.reference_temperature if profile.reference_temperature is not None else 25.0
+        reference_humidity[row] = profile.reference_humidity if profile.reference_humidity is not None else 50.0
+    
+    return CalibrationState(index, baseline, gain, temperature_coeff, humidity_coeff,
+                            reference_temperature, reference_humidity)
+
+
+def _readings(values: Optional[Sequence[Optional[float]]], count: int) -> np.ndarray:
+    if values is None:
+        return np.full(count, np.nan, dtype=np.float32)
+    return np.array(values, dtype=np.float32)
+
+
+def calibration_stamp(db: Session) -> Tuple[int, Optional[datetime]]:
+    count, last_updated = db.query(func.count(DeviceCalibration.device_id), func.max(DeviceCalibration.updated_at)).one()
+    return count, last_updated
+
+
+class CalibrationTable:
+    def __init__(self, vector_size: int = VECTOR_SIZE, check_interval_seconds: float = CHECK_INTERVAL_SECONDS):
+        self.vector_size = vector_size
+        self.check_interval_seconds = check_interval_seconds
+        self._state = build_state([], vector_size)
+        self._stamp: Optional[Tuple[int, Optional[datetime]]] = None
+        self._checked_at = 0.0
+        self._load_lock = threading.Lock()
+        self.loads = 0
+    
+    def _load(self, db: Session):
+        self._stamp = calibration_stamp(db)
+        self._state = build_state(db.query(DeviceCalibration).all(), self.vector_size)
+        self._checked_at = time.monotonic()
+        self.loads += 1
+    
+    def load(self, db: Session):
+        with self._load_lock:
+            self._load(db)
+    
+    def sync(self, db: Session):
+        now = time.monotonic()
+        if self._stamp is not None and now - self._checked_at < self.check_interval_seconds:
+            return
+        with self._load_lock:
+            if self._stamp is not None and now - self._checked_at < self.check_interval_seconds:
+                return
+            if calibration_stamp(db) != self._stamp:
+                self._load(db)
+            else:
+                self._checked_at = now
+    
+    def __contains__(self, device_id: str) -> bool:
+        return device_id in self._state.index
+    
+    def apply(self, matrix: np.ndarray, device_ids: Sequence[Optional[str]],
+              temperatures: Optional[Sequence[Optional[float]]] = None,
+              humidities: Optional[Sequence[Optional[float]]] = None) -> np.ndarray:
+        state = self._state
+        if not state.index:
+            return matrix
+        
+        rows = np.fromiter((state.index.get(device_id, 0) for device_id in device_ids), dtype=np.int64, count=len(device_ids))
+        if not rows.any():
+            return matrix
+        
+        temperature = _readings(temperatures, len(rows))
+        humidity = _readings(humidities, len(rows))
+        temperature_delta = np.where(np.isnan(temperature), 0.0, temperature - state.reference_temperature[rows])
+        humidity_delta = np.where(np.isnan(humidity), 0.0, humidity - state.reference_humidity[rows])
+        
+        matrix -= state.baseline[rows]
+        matrix -= state.temperature_coeff[rows] * temperature_delta[:, None].astype(np.float32)
+        matrix -= state.humidity_coeff[rows] * humidity_delta[:, None].astype(np.float32)
+        matrix *= state.gain[rows]
+        return matrix
+    
+    def metrics(self) -> dict:
+        return {
+            "devices": len(self._state.index),
+            "loads": self.loads,
+        }
+
+
+calibration_table = CalibrationTable()
+
+
+def get_calibration_table() -> CalibrationTable:
+    return calibration_table
@@ -0,0 +1,191 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.models import Fragrance
+from backend.schemas import FragranceResponse, FragranceListResponse
+
+CHECK_INTERVAL_SECONDS = float(os.environ.get("SCENT_CATALOG_CHECK_SECONDS", 30))
+CHANGE_LOG_SIZE = 256
+
+
+def fragrance_to_response(fragrance: Fragrance, is_favorite: bool = False) -> FragranceResponse:
+    return FragranceResponse(
+        id=fragrance.id,
+        name=fragrance.name,
+        brand=fragrance.brand,
+        description=fragrance.description,
+        image_url=fragrance.image_url,
+        top_notes=fragrance.top_notes or [],
+        mid_notes=fragrance.mid_notes or [],
+        base_notes=fragrance.base_notes or [],
+        concentration=fragrance.concentration,
+        gender=fragrance.gender,
+        year_released=fragrance.year_released,
+        longevity_hours=fragrance.longevity_hours,
+        projection=fragrance.projection,
+        price_min=fragrance.price_min,
+        price_max=fragrance.price_max,
+        price_url=fragrance.price_url,
+        avg_rating=fragrance.avg_rating or 0.0,
+        review_count=fragrance.review_count or 0,
+        created_at=fragrance.created_at,
+        is_favorite=is_favorite
+    )
+
+
+def fragrance_to_list_response(fragrance: Fragrance, is_favorite: bool = False) -> FragranceListResponse:
+    return FragranceListResponse(
+        id=fragrance.id,
+        name=fragrance.name,
+        brand=fragrance.brand,
+        image_url=fragrance.image_url,
+        top_notes=fragrance.top_notes or [],
+        concentration=fragrance.concentration,
+        avg_rating=fragrance.avg_rating or 0.0,
+        is_favorite=is_favorite
+    )
+
+
+class FragranceRecord(NamedTuple):
+    id: str
+    name: str
+    brand: str
+    gender: Optional[str]
+    concentration: Optional[str]
+    avg_rating: float
+    review_count: int
+    top_notes: Tuple[str, ...]
+    mid_notes: Tuple[str, ...]
+    base_notes: Tuple[str, ...]
+    response: FragranceResponse
+    list_response: FragranceListResponse
+    
+    def detail(self, is_favorite: bool = False) -> FragranceResponse:
+        if is_favorite:
+            return self.response.model_copy(update={"is_favorite": True})
+        return self.response
+    
+    def list_item(self, is_favorite: bool = False) -> FragranceListResponse:
+        if is_favorite:
+            return self.list_response.model_copy(update={"is_favorite": True})
+        return self.list_response
+
+
+def build_record(fragrance: Fragrance) -> FragranceRecord:
+    return FragranceRecord(
+        id=fragrance.id,
+        name=fragrance.name,
+        brand=fragrance.brand,
+        gender=fragrance.gender,
+        concentration=fragrance.concentration,
+        avg_rating=fragrance.avg_rating or 0.0,
+        review_count=fragrance.review_count or 0,
+        top_notes=tuple(fragrance.top_notes or ()),
+        mid_notes=tuple(fragrance.mid_notes or ()),
+        base_notes=tuple(fragrance.base_notes or ()),
+        response=fragrance_to_response(fragrance),
+        list_response=fragrance_to_list_response(fragrance)
+    )
+
+
+def catalog_stamp(db: Session) -> Tuple[int, Optional[datetime]]:
+    count, last_updated = db.query(func.count(Fragrance.id), func.max(Fragrance.updated_at)).one()
+    return count, last_updated
+
+
+class CatalogCache:
+    def __init__(self, check_interval_seconds: float = CHECK_INTERVAL_SECONDS):
+        self.check_interval_seconds = check_interval_seconds
+        self._records: Dict[str, FragranceRecord] = {}
+        self._stamp: Optional[Tuple[int, Optional[datetime]]] = None
+        self._checked_at = 0.0
+        self._changes: List[Tuple[int, Tuple[str, ...]]] = []
+        self._changes_from = 0
+        self._lock = threading.Lock()
+        self.version = 0
+        self.full_loads = 0
+        self.incremental_loads = 0
+    
+    def invalidate(self):
+        with self._lock:
+            self._checked_at = 0.0
+    
+    def _load_all(self, db: Session, stamp: Tuple[int, Optional[datetime]]):
+        self._records = {f.id: build_record(f) for f in db.query(Fragrance).all()}
+        self._stamp = stamp
+        self.version += 1
+        self.full_loads += 1
+        self._changes = []
+        self._changes_from = self.version
+    
+    def _load_changed(self, db: Session, stamp: Tuple[int, Optional[datetime]]) -> bool:
+        _, last_updated = self._stamp
+        if last_updated is None:
+            return False
+        changed = db.query(Fragrance).filter(Fragrance.updated_at > last_updated).all()
+        records = dict(self._records)
+        records.update((f.id, build_record(f)) for f in changed)
+        if len(records) != stamp[0]:
+            return False
+        self._records = records
+        self._stamp = stamp
+        self.version += 1
+        self.incremental_loads += 1
+        self._changes.append((self.version, tuple(f.id for f in changed)))
+        if len(self._changes) > CHANGE_LOG_SIZE:
+            self._changes_from = self._changes.pop(0)[0]
+        return True
+    
+    def sync(self, db: Session):
+        now = time.monotonic()
+        if self._stamp is not None and now - self._checked_at < self.check_interval_seconds:
+            return
+        with self._lock:
+            if self._stamp is not None and now - self._checked_at < self.check_interval_seconds:
+                return
+            stamp = catalog_stamp(db)
+            if stamp != self._stamp:
+                if self._stamp is None or not self._load_changed(db, stamp):
+                    self._load_all(db, stamp)
+            self._checked_at = now
+    
+    def records(self, db: Session) -> Dict[str, FragranceRecord]:
+        self.sync(db)
+        return self._records
+    
+    def snapshot(self, db: Session) -> Tuple[int, Dict[str, FragranceRecord]]:
+        self.sync(db)
+        with self._lock:
+            return self.version, self._records
+    
+    def changes_since(self, version: int) -> Optional[Set[str]]:
+        with self._lock:
+            if version < self._changes_from:
+                return None
+            return {fragrance_id for v, ids in self._changes if v > version for fragrance_id in ids}
+    
+    def get(self, db: Session, fragrance_id: str) -> Optional[FragranceRecord]:
+        return self.records(db).get(fragrance_id)
+    
+    def get_many(self, db: Session, fragrance_ids: Iterable[str]) -> List[FragranceRecord]:
+        records = self.records(db)
+        return [records[fragrance_id] for fragrance_id in fragrance_ids if fragrance_id in records]
+    
+    def metrics(self) -> dict:
+        return {
+            "version": self.version,
+            "fragrances": len(self._records),
+            "full_loads": self.full_loads,
+            "incremental_loads": self.incremental_loads,
+        }
+
+
+catalog = CatalogCache()
+
+
+def get_catalog() -> CatalogCache:
+    return catalog
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import func
+from backend.database import SessionLocal
+from backend.models import Feedback, Fragrance, Scan, TrainingData
+from backend.ml_model import catalog_version
+from backend.model_registry import get_registry
+
+BATCH_SIZE = int(os.environ.get("SCENT_FEEDBACK_BATCH_SIZE", 256))
+INTERVAL_SECONDS = float(os.environ.get("SCENT_FEEDBACK_INTERVAL_SECONDS", 30))
+LINGER_SECONDS = float(os.environ.get("SCENT_FEEDBACK_LINGER_SECONDS", 1.0))
+
+
+class FeedbackPipeline:
+    def __init__(self, batch_size: int = BATCH_SIZE, interval_seconds: float = INTERVAL_SECONDS,
+                 linger_seconds: float = LINGER_SECONDS):
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.linger_seconds = linger_seconds
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._batch_lock = threading.Lock()
+        self.feedback_processed = 0
+        self.training_rows_created = 0
+        self.recent_batches = deque(maxlen=20)
+    
+    def process_batch(self) -> Optional[dict]:
+        with self._batch_lock:
+            start = time.perf_counter()
+            db = SessionLocal()
+            try:
+                rows = db.query(Feedback, Scan.fragrance_id, Scan.raw_voc_vector).join(
+                    Scan, Feedback.scan_id == Scan.id
+                ).filter(
+                    Feedback.processed_at.is_(None)
+                ).order_by(Feedback.created_at).limit(self.batch_size).all()
+                
+                if not rows:
+                    return None
+                
+                corrected_names = {
+                    feedback.correct_fragrance_name.strip().lower()
+                    for feedback, _, _ in rows
+                    if not feedback.is_correct and feedback.correct_fragrance_name
+                }
+                fragrance_ids_by_name = {}
+                if corrected_names:
+                    matches = db.query(func.lower(Fragrance.name), Fragrance.id).filter(
+                        func.lower(Fragrance.name).in_(corrected_names)
+                    ).all()
+                    fragrance_ids_by_name = dict(matches)
+                
+                base_version = catalog_version(db)
+                processed_at = datetime.utcnow()
+                samples = []
+                for feedback, scan_fragrance_id, raw_voc_vector in rows:
+                    feedback.processed_at = processed_at
+                    if feedback.is_correct:
+                        fragrance_id = scan_fragrance_id
+                    elif feedback.correct_fragrance_name:
+                        fragrance_id = fragrance_ids_by_name.get(feedback.correct_fragrance_name.strip().lower())
+                    else:
+                        fragrance_id = None
+                    if fragrance_id and raw_voc_vector:
+                        samples.append((feedback.id, fragrance_id, raw_voc_vector))
+                
+                db.add_all([
+                    TrainingData(
+                        fragrance_id=fragrance_id,
+                        feedback_id=feedback_id,
+                        voc_vector=voc_vector,
+                        source="feedback",
+                        verified=True
+                    )
+                    for feedback_id, fragrance_id, voc_vector in samples
+                ])
+                db.commit()
+            finally:
+                db.close()
+            
+            model_version = None
+            if samples:
+                fragrance_ids = [fragrance_id for _, fragrance_id, _ in samples]
+                voc_vectors = [voc_vector for _, _, voc_vector in samples]
+                model_version = get_registry().update(
+                    lambda model: model.add_samples(fragrance_ids, voc_vectors),
+                    base_version
+                )
+            
+            seconds = time.perf_counter() - start
+            report = {
+                "feedback_items": len(rows),
+                "training_rows": len(samples),
+                "seconds": seconds,
+                "items_per_second": len(rows) / seconds if seconds > 0 else 0.0,
+                "model_version": model_version,
+                "processed_at": processed_at.isoformat(),
+            }
+            self.feedback_processed += len(rows)
+            self.training_rows_created += len(samples)
+            self.recent_batches.append(report)
+            return report
+    
+    def process_pending(self) -> list:
+        reports = []
+        while True:
+            report = self.process_batch()
+            if report is None:
+                return reports
+            reports.append(report)
+    
+    def notify(self):
+        self._wakeup.set()
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            if self._wakeup.wait(self.interval_seconds):
+                self._stopping.wait(self.linger_seconds)
+            self._wakeup.clear()
+            try:
+                self.process_pending()
+            except Exception as e:
+                print(f"Warning: Feedback pipeline batch failed: {e}")
+    
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="feedback-pipeline", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def metrics(self) -> dict:
+        return {
+            "feedback_processed": self.feedback_processed,
+            "training_rows_created": self.training_rows_created,
+            "recent_batches": list(self.recent_batches),
+        }
+
+
+pipeline = FeedbackPipeline()
+
+
+def get_feedback_pipeline() -> FeedbackPipeline:
+    return pipeline
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Tuple
+
+STORE_SIZE = int(os.environ.get("SCENT_IDEMPOTENCY_STORE_SIZE", 50000))
+STORE_BYTES = int(os.environ.get("SCENT_IDEMPOTENCY_STORE_BYTES", 128 * 1024 * 1024))
+TTL_SECONDS = float(os.environ.get("SCENT_IDEMPOTENCY_TTL_SECONDS", 600))
+
+
+class IdempotencyConflict(Exception):
+    pass
+
+
+def fingerprint(payload: str) -> str:
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, max_entries: int = STORE_SIZE, max_bytes: int = STORE_BYTES,
+                 ttl_seconds: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._in_flight: Dict[tuple, Tuple[str, asyncio.Future]] = {}
+        self._results: "OrderedDict[tuple, Tuple[float, str, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.joins = 0
+        self.misses = 0
+        self.conflicts = 0
+        self.evictions = 0
+    
+    def _evict(self, now: float):
+        while self._results:
+            key, (expires_at, _, result) = next(iter(self._results.items()))
+            if expires_at >= now and len(self._results) <= self.max_entries and (
+                self._bytes <= self.max_bytes or len(self._results) == 1
+            ):
+                return
+            del self._results[key]
+            self._bytes -= len(result)
+            self.evictions += 1
+    
+    def _complete(self, key: tuple, payload_fingerprint: str, task: asyncio.Future):
+        del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        result = task.result()
+        self._results[key] = (time.monotonic() + self.ttl_seconds, payload_fingerprint, result)
+        self._bytes += len(result)
+        self._evict(time.monotonic())
+    
+    async def run(self, key: tuple, payload_fingerprint: str,
+                  compute: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, bool]:
+        self._evict(time.monotonic())
+        
+        stored = self._results.get(key)
+        if stored is not None:
+            _, stored_fingerprint, result = stored
+            if stored_fingerprint != payload_fingerprint:
+                self.conflicts += 1
+                raise IdempotencyConflict()
+            self.hits += 1
+            return result, True
+        
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            in_flight_fingerprint, task = in_flight
+            if in_flight_fingerprint != payload_fingerprint:
+                self.conflicts += 1
+                raise IdempotencyConflict()
+            self.joins += 1
+            return await asyncio.shield(task), True
+        
+        self.misses += 1
+        task = asyncio.ensure_future(compute())
+        self._in_flight[key] = (payload_fingerprint, task)
+        task.add_done_callback(lambda task: self._complete(key, payload_fingerprint, task))
+        return await asyncio.shield(task), False
+    
+    def metrics(self) -> dict:
+        return {
+            "entries": len(self._results),
+            "bytes": self._bytes,
+            "in_flight": len(self._in_flight),
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "joins": self.joins,
+            "misses": self.misses,
+            "conflicts": self.conflicts,
+            "evictions": self.evictions,
+        }
+
+
+store = IdempotencyStore()
+
+
+def get_idempotency_store() -> IdempotencyStore:
+    return store
@@ -0,0 +1,96 @@
+import heapq
+import json
+import threading
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from backend.catalog import FragranceRecord, get_catalog
+
+MAX_ENTRIES = 512
+BROWSE_DEPTH = 1000
+
+
+class CachedList(NamedTuple):
+    body: bytes
+    ids: Tuple[str, ...] = ()
+    items: Tuple[bytes, ...] = ()
+    favorite_items: Tuple[bytes, ...] = ()
+    
+    def render(self, favorite_ids: Optional[Set[str]] = None) -> bytes:
+        if not favorite_ids or favorite_ids.isdisjoint(self.ids):
+            return self.body
+        return b"[" + b",".join(
+            favorite if fragrance_id in favorite_ids else item
+            for fragrance_id, item, favorite in zip(self.ids, self.items, self.favorite_items)
+        ) + b"]"
+
+
+def fragrance_list(records: List[FragranceRecord]) -> CachedList:
+    items = tuple(record.list_item().model_dump_json().encode() for record in records)
+    return CachedList(
+        body=b"[" + b",".join(items) + b"]",
+        ids=tuple(record.id for record in records),
+        items=items,
+        favorite_items=tuple(record.list_item(True).model_dump_json().encode() for record in records)
+    )
+
+
+def popular_list(records: Dict[str, FragranceRecord], limit: int) -> CachedList:
+    return fragrance_list(heapq.nsmallest(limit, records.values(), key=lambda r: (-r.avg_rating, -r.review_count, r.id)))
+
+
+def browse_list(records: Dict[str, FragranceRecord], limit: int, offset: int) -> CachedList:
+    ranked = heapq.nsmallest(offset + limit, records.values(), key=lambda r: (-r.avg_rating, r.id))
+    return fragrance_list(ranked[offset:])
+
+
+def brand_list(records: Dict[str, FragranceRecord]) -> CachedList:
+    brands = sorted({record.brand for record in records.values() if record.brand})
+    return CachedList(body=json.dumps(brands).encode())
+
+
+class ListCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, CachedList] = {}
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+    
+    def get(self, db: Session, key: Hashable, build: Callable[[Dict[str, FragranceRecord]], CachedList]) -> CachedList:
+        version, records = get_catalog().snapshot(db)
+        with self._lock:
+            if self._version is None or version > self._version:
+                self._entries = {}
+                self._version = version
+                self.invalidations += 1
+            entry = self._entries.get(key) if version == self._version else None
+            if entry is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+        
+        entry = build(records)
+        with self._lock:
+            if version == self._version:
+                if len(self._entries) >= self.max_entries:
+                    self._entries = {}
+                self._entries[key] = entry
+        return entry
+    
+    def metrics(self) -> dict:
+        return {
+            "version": self._version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+list_cache = ListCache()
+
+
+def get_list_cache() -> ListCache:
+    return list_cache
@@ -6,28 +6,61 @@ from fastapi.responses import FileResponse, JSONResponse
 from contextlib import asynccontextmanager
 
 from backend.database import engine, Base, SessionLocal
-from backend.routes import auth_router, scans_router, fragrances_router, favorites_router, feedback_router
-from backend.ml_model import get_model
+from backend.routes import auth_router, scans_router, fragrances_router, favorites_router, feedback_router, sensor_router
+from backend.model_registry import get_model, get_registry
+from backend.migrations import run_migrations
+from backend.feedback_pipeline import get_feedback_pipeline
+from backend.catalog import get_catalog
+from backend.write_behind import get_write_behind
+from backend.calibration import get_calibration_table
+from backend.idempotency import get_idempotency_store
+from backend.search import get_full_text_search
+from backend.note_index import get_note_index
+from backend.autocomplete import get_autocomplete
+from backend.list_cache import get_list_cache
 from backend.seed_data import seed_fragrances
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    get_full_text_search().ensure(engine)
     
     seed_fragrances()
     
     db = SessionLocal()
     try:
-        model = get_model()
-        model.fit(db)
-        print("ML model fitted successfully!")
-    except Exception as e:
-        print(f"Warning: Could not fit ML model: {e}")
+        get_calibration_table().load(db)
+        get_autocomplete().warm(db)
     finally:
         db.close()
     
+    registry = get_registry()
+    try:
+        if registry.initialize():
+            print("ML model loaded from snapshot!")
+        else:
+            report = get_model().last_fit_report or {}
+            print(
+                f"ML model fitted successfully! {report.get('samples_ingested', 0)} samples, "
+                f"{report.get('vectors_indexed', 0)} vectors indexed in {report.get('fit_seconds', 0.0):.2f}s"
+            )
+    except Exception as e:
+        print(f"Warning: Could not fit ML model: {e}")
+    registry.start()
+    
+    feedback_pipeline = get_feedback_pipeline()
+    feedback_pipeline.start()
+    
+    write_behind = get_write_behind()
+    write_behind.start()
+    
     yield
+    
+    write_behind.stop()
+    feedback_pipeline.stop()
+    registry.stop()
 
 
 app = FastAPI(
@@ -43,6 +76,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Idempotent-Replayed"],
 )
 
 app.include_router(auth_router, prefix="/api")
@@ -50,6 +84,7 @@ app.include_router(scans_router, prefix="/api")
 app.include_router(fragrances_router, prefix="/api")
 app.include_router(favorites_router, prefix="/api")
 app.include_router(feedback_router, prefix="/api")
+app.include_router(sensor_router, prefix="/api")
 
 
 @app.get("/api/health")
@@ -57,6 +92,23 @@ async def health_check():
     return {"status": "healthy", "service": "ScentID API"}
 
 
+@app.get("/api/metrics")
+async def metrics():
+    return {
+        "model": get_model().metrics(),
+        "registry": get_registry().metrics(),
+        "feedback_pipeline": get_feedback_pipeline().metrics(),
+        "catalog": get_catalog().metrics(),
+        "write_behind": get_write_behind().metrics(),
+        "calibration": get_calibration_table().metrics(),
+        "idempotency": get_idempotency_store().metrics(),
+        "search": get_full_text_search().metrics(),
+        "note_index": get_note_index().metrics(),
+        "autocomplete": get_autocomplete().metrics(),
+        "list_cache": get_list_cache().metrics(),
+    }
+
+
 @app.get("/api/sensor/simulate")
 async def simulate_sensor_data():
     import numpy as np
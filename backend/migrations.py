@@ -0,0 +1,149 @@
+from sqlalchemy import Table, Column, func, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.types import LargeBinary
+from backend.database import Base
+from backend.models import SensorBucket
+from backend.sensor_ingest import merge_bucket
+from backend.vector_codec import PackedVector, pack_json_vector
+
+MIGRATION_BATCH_SIZE = 5000
+LEGACY_SENSOR_BUCKET_INDEX = "ix_sensor_buckets_device_bucket"
+
+
+def add_missing_columns(engine: Engine):
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"Added column {table.name}.{column.name}")
+
+
+def add_missing_indexes(engine: Engine):
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                index.create(bind=conn)
+                print(f"Added index {table.name}.{index.name}")
+
+
+def _pack_vector_column(engine: Engine, table: Table, column: Column):
+    packed = f"{column.name}_packed"
+    primary_key = table.primary_key.columns.values()[0].name
+    binary_type = LargeBinary().compile(dialect=engine.dialect)
+    
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {packed} {binary_type}"))
+        converted = 0
+        while True:
+            rows = conn.execute(text(
+                f"SELECT {primary_key}, {column.name} FROM {table.name} "
+                f"WHERE {column.name} IS NOT NULL AND {packed} IS NULL LIMIT {MIGRATION_BATCH_SIZE}"
+            )).all()
+            if not rows:
+                break
+            conn.execute(
+                text(f"UPDATE {table.name} SET {packed} = :packed WHERE {primary_key} = :id"),
+                [{"id": row_id, "packed": pack_json_vector(value) or b""} for row_id, value in rows]
+            )
+            converted += len(rows)
+        conn.execute(text(f"ALTER TABLE {table.name} DROP COLUMN {column.name}"))
+        conn.execute(text(f"ALTER TABLE {table.name} RENAME COLUMN {packed} TO {column.name}"))
+        if not column.nullable:
+            _restore_not_null(conn, table, column)
+    
+    print(f"Packed {converted} vectors in {table.name}.{column.name}")
+
+
+def _rebuild_sqlite_table(conn: Connection, table: Table):
+    previous = f"{table.name}_previous"
+    for index in inspect(conn).get_indexes(table.name):
+        conn.execute(text(f"DROP INDEX {index['name']}"))
+    conn.execute(text("PRAGMA legacy_alter_table = ON"))
+    conn.execute(text(f"ALTER TABLE {table.name} RENAME TO {previous}"))
+    conn.execute(text("PRAGMA legacy_alter_table = OFF"))
+    table.create(bind=conn)
+    columns = ", ".join(column.name for column in table.columns)
+    conn.execute(text(f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {previous}"))
+    conn.execute(text(f"DROP TABLE {previous}"))
+
+
+def _restore_not_null(conn: Connection, table: Table, column: Column):
+    if conn.dialect.name == "sqlite":
+        _rebuild_sqlite_table(conn, table)
+    else:
+        conn.execute(text(f"ALTER TABLE {table.name} ALTER COLUMN {column.name} SET NOT NULL"))
+    print(f"Restored NOT NULL on {table.name}.{column.name}")
+
+
+def migrate_packed_vectors(engine: Engine):
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"]: column for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if not isinstance(column.type, PackedVector) or column.name not in existing:
+                continue
+            if isinstance(existing[column.name]["type"], LargeBinary):
+                if existing[column.name]["nullable"] and not column.nullable:
+                    with engine.begin() as conn:
+                        _restore_not_null(conn, table, column)
+                continue
+            _pack_vector_column(engine, table, column)
+
+
+def merge_sensor_buckets(engine: Engine):
+    inspector = inspect(engine)
+    table = SensorBucket.__table__
+    if not inspector.has_table(table.name):
+        return
+    indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+    if LEGACY_SENSOR_BUCKET_INDEX not in indexes:
+        return
+    
+    merged = 0
+    with Session(engine) as db:
+        duplicates = db.query(SensorBucket.device_id, SensorBucket.bucket_start).group_by(
+            SensorBucket.device_id, SensorBucket.bucket_start
+        ).having(func.count() > 1).all()
+        for device_id, bucket_start in duplicates:
+            buckets = db.query(SensorBucket).filter(
+                SensorBucket.device_id == device_id,
+                SensorBucket.bucket_start == bucket_start
+            ).order_by(SensorBucket.created_at, SensorBucket.id).all()
+            for bucket in buckets[1:]:
+                merge_bucket(buckets[0], {
+                    "vector_size": bucket.vector_size,
+                    "offsets": bucket.offsets,
+                    "readings": bucket.readings,
+                    "temperatures": bucket.temperatures,
+                    "humidities": bucket.humidities,
+                })
+                db.delete(bucket)
+                merged += 1
+        db.commit()
+    
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {LEGACY_SENSOR_BUCKET_INDEX}"))
+    print(f"Merged {merged} duplicate rows in {table.name}")
+
+
+def run_migrations(engine: Engine):
+    add_missing_columns(engine)
+    migrate_packed_vectors(engine)
+    merge_sensor_buckets(engine)
+    add_missing_indexes(engine)
@@ -0,0 +1,345 @@
+import time
+import numpy as np
+from typing import List, Optional, Tuple
+from sklearn.neighbors import NearestNeighbors
+
+SEARCH_BLOCK_ELEMENTS = 1 << 24
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def grow_rows(buffer: np.ndarray, required: int) -> np.ndarray:
+    if len(buffer) >= required and buffer.flags.writeable:
+        return buffer
+    grown = np.empty((max(required, 2 * len(buffer)),) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:len(buffer)] = buffer
+    return grown
+
+
+def _nearest_rows(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    block_rows = max(1, SEARCH_BLOCK_ELEMENTS // max(len(centroids), 1))
+    for start in range(0, len(vectors), block_rows):
+        end = start + block_rows
+        assignments[start:end] = np.argmax(vectors[start:end] @ centroids.T, axis=1)
+    return assignments
+
+
+class SklearnIndex:
+    name = "sklearn"
+    supports_updates = False
+    
+    def __init__(self):
+        self.mean = None
+        self.scale = None
+        self.nn_model = None
+        self.size = 0
+        self.build_seconds = 0.0
+        self.query_count = 0
+        self.query_seconds = 0.0
+    
+    def build(self, vectors: np.ndarray, mean: np.ndarray, scale: np.ndarray):
+        start = time.perf_counter()
+        self.mean = mean
+        self.scale = scale
+        self.size = len(vectors)
+        self.nn_model = NearestNeighbors(n_neighbors=min(5, self.size), metric='cosine')
+        self.nn_model.fit((vectors - mean) / scale)
+        self.build_seconds = time.perf_counter() - start
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        start = time.perf_counter()
+        k = min(k, self.size)
+        distances, indices = self.nn_model.kneighbors((queries - self.mean) / self.scale, n_neighbors=k)
+        self.query_count += len(queries)
+        self.query_seconds += time.perf_counter() - start
+        return 1 - distances, indices
+    
+    def state(self) -> dict:
+        return {}
+    
+    def metrics(self) -> dict:
+        return {
+            "engine": self.name,
+            "size": self.size,
+            "build_seconds": self.build_seconds,
+            "query_count": self.query_count,
+            "query_seconds": self.query_seconds,
+        }
+
+
+class ExactIndex:
+    name = "numpy"
+    supports_updates = True
+    
+    def __init__(self):
+        self.mean = None
+        self.inv_scale = None
+        self.matrix = None
+        self._buffer = None
+        self.size = 0
+        self.build_seconds = 0.0
+        self.query_count = 0
+        self.query_seconds = 0.0
+    
+    def build(self, vectors: np.ndarray, mean: np.ndarray, scale: np.ndarray):
+        start = time.perf_counter()
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.inv_scale = (1.0 / np.asarray(scale, dtype=np.float32)).astype(np.float32)
+        self._buffer = np.ascontiguousarray(self._transform(vectors))
+        self._set_size(len(self._buffer))
+        self.build_seconds = time.perf_counter() - start
+    
+    def state(self) -> dict:
+        return {"matrix": self.matrix}
+    
+    def load_state(self, state: dict, mean: np.ndarray, scale: np.ndarray):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.inv_scale = (1.0 / np.asarray(scale, dtype=np.float32)).astype(np.float32)
+        self._buffer = state["matrix"]
+        self._set_size(len(self._buffer))
+    
+    def _set_size(self, size: int):
+        self.size = size
+        self.matrix = self._buffer[:size]
+    
+    def add(self, vectors: np.ndarray):
+        rows = self._transform(vectors)
+        self._buffer = grow_rows(self._buffer, self.size + len(rows))
+        self._buffer[self.size:self.size + len(rows)] = rows
+        self._set_size(self.size + len(rows))
+    
+    def remove(self, position: int):
+        last = self.size - 1
+        self._buffer = grow_rows(self._buffer, self.size)
+        if position != last:
+            self._buffer[position] = self._buffer[last]
+        self._set_size(last)
+    
+    def update(self, position: int, vector: np.ndarray):
+        self._buffer = grow_rows(self._buffer, self.size)
+        self._set_size(self.size)
+        self._buffer[position] = self._transform(vector.reshape(1, -1))[0]
+    
+    def _transform(self, vectors: np.ndarray) -> np.ndarray:
+        scaled = (np.asarray(vectors, dtype=np.float32) - self.mean) * self.inv_scale
+        return _normalize_rows(scaled)
+    
+    def _search_block(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        similarities = queries @ self.matrix.T
+        
+        if k < self.size:
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self.size), similarities.shape)
+        
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1, kind='stable')
+        
+        return np.take_along_axis(top_similarities, order, axis=1), np.take_along_axis(top, order, axis=1)
+    
+    def _search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(queries) * self.size <= SEARCH_BLOCK_ELEMENTS:
+            return self._search_block(queries, k)
+        
+        similarities = np.empty((len(queries), k), dtype=np.float32)
+        indices = np.empty((len(queries), k), dtype=np.int64)
+        block_rows = max(1, SEARCH_BLOCK_ELEMENTS // self.size)
+        for start in range(0, len(queries), block_rows):
+            end = start + block_rows
+            similarities[start:end], indices[start:end] = self._search_block(queries[start:end], k)
+        
+        return similarities, indices
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        start = time.perf_counter()
+        k = min(k, self.size)
+        result = self._search(self._transform(queries), k)
+        self.query_count += len(queries)
+        self.query_seconds += time.perf_counter() - start
+        return result
+    
+    def metrics(self) -> dict:
+        return {
+            "engine": self.name,
+            "size": self.size,
+            "build_seconds": self.build_seconds,
+            "query_count": self.query_count,
+            "query_seconds": self.query_seconds,
+        }
+
+
+class IVFIndex(ExactIndex):
+    name = "ivf"
+    
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, kmeans_iterations: int = 10,
+                 train_size_per_list: int = 64, exact_threshold: int = 2048, seed: int = 0):
+        super().__init__()
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.kmeans_iterations = kmeans_iterations
+        self.train_size_per_list = train_size_per_list
+        self.exact_threshold = exact_threshold
+        self.seed = seed
+        self.centroids = None
+        self.lists: List[np.ndarray] = []
+        self.assignments = None
+        self.train_seconds = 0.0
+        self.candidates_scanned = 0
+    
+    def _train_centroids(self, vectors: np.ndarray, n_lists: int) -> np.ndarray:
+        rng = np.random.default_rng(self.seed)
+        train_size = min(len(vectors), n_lists * self.train_size_per_list)
+        sample = vectors[rng.choice(len(vectors), train_size, replace=False)]
+        centroids = sample[rng.choice(train_size, n_lists, replace=False)].copy()
+        
+        for _ in range(self.kmeans_iterations):
+            assignments = _nearest_rows(sample, centroids)
+            counts = np.bincount(assignments, minlength=n_lists)
+            sums = np.stack([
+                np.bincount(assignments, weights=sample[:, dim], minlength=n_lists)
+                for dim in range(sample.shape[1])
+            ], axis=1).astype(np.float32)
+            empty = np.flatnonzero(counts == 0)
+            sums[empty] = sample[rng.choice(train_size, len(empty), replace=False)]
+            centroids = _normalize_rows(sums)
+        
+        return centroids
+    
+    def build(self, vectors: np.ndarray, mean: np.ndarray, scale: np.ndarray):
+        start = time.perf_counter()
+        super().build(vectors, mean, scale)
+        
+        n_lists = self.n_lists or max(1, int(4 * np.sqrt(self.size)))
+        n_lists = min(n_lists, self.size)
+        
+        train_start = time.perf_counter()
+        self.centroids = self._train_centroids(self.matrix, n_lists)
+        self.train_seconds = time.perf_counter() - train_start
+        
+        self._assign_lists(_nearest_rows(self.matrix, self.centroids))
+        
+        self.build_seconds = time.perf_counter() - start
+    
+    def _assign_lists(self, assignments: np.ndarray):
+        n_lists = len(self.centroids)
+        self.assignments = assignments
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(n_lists)]
+    
+    def state(self) -> dict:
+        return {
+            **super().state(),
+            "centroids": self.centroids,
+            "assignments": self.assignments[:self.size],
+        }
+    
+    def load_state(self, state: dict, mean: np.ndarray, scale: np.ndarray):
+        super().load_state(state, mean, scale)
+        self.centroids = np.asarray(state["centroids"])
+        self._assign_lists(np.asarray(state["assignments"]))
+    
+    def add(self, vectors: np.ndarray):
+        first = self.size
+        super().add(vectors)
+        
+        new_assignments = _nearest_rows(self.matrix[first:], self.centroids)
+        self.assignments = grow_rows(self.assignments, self.size)
+        self.assignments[first:self.size] = new_assignments
+        for position, list_id in enumerate(new_assignments, start=first):
+            self.lists[list_id] = np.append(self.lists[list_id], position)
+    
+    def remove(self, position: int):
+        last = self.size - 1
+        self.assignments = grow_rows(self.assignments, self.size)
+        
+        list_id = self.assignments[position]
+        self.lists[list_id] = self.lists[list_id][self.lists[list_id] != position]
+        if position != last:
+            last_list_id = self.assignments[last]
+            self.lists[last_list_id] = np.where(self.lists[last_list_id] == last, position, self.lists[last_list_id])
+            self.assignments[position] = last_list_id
+        
+        super().remove(position)
+    
+    def update(self, position: int, vector: np.ndarray):
+        super().update(position, vector)
+        
+        list_id = self.assignments[position]
+        new_list_id = _nearest_rows(self.matrix[position:position + 1], self.centroids)[0]
+        if new_list_id != list_id:
+            self.assignments = grow_rows(self.assignments, self.size)
+            self.lists[list_id] = self.lists[list_id][self.lists[list_id] != position]
+            self.lists[new_list_id] = np.append(self.lists[new_list_id], position)
+            self.assignments[position] = new_list_id
+    
+    def _search_ivf(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        n_probe = min(self.n_probe, len(self.lists))
+        centroid_similarities = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_similarities, n_probe - 1, axis=1)[:, :n_probe]
+        
+        similarities = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        
+        for row, (query, query_probes) in enumerate(zip(queries, probes)):
+            candidates = np.concatenate([self.lists[probe] for probe in query_probes])
+            self.candidates_scanned += len(candidates)
+            if len(candidates) == 0:
+                continue
+            
+            candidate_similarities = self.matrix[candidates] @ query
+            top_k = min(k, len(candidates))
+            if top_k < len(candidates):
+                top = np.argpartition(-candidate_similarities, top_k - 1)[:top_k]
+            else:
+                top = np.arange(len(candidates))
+            top = top[np.argsort(-candidate_similarities[top], kind='stable')]
+            
+            similarities[row, :top_k] = candidate_similarities[top]
+            indices[row, :top_k] = candidates[top]
+        
+        return similarities, indices
+    
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        start = time.perf_counter()
+        k = min(k, self.size)
+        queries = self._transform(queries)
+        
+        if self.size <= self.exact_threshold:
+            result = self._search(queries, k)
+        else:
+            result = self._search_ivf(queries, k)
+        
+        self.query_count += len(queries)
+        self.query_seconds += time.perf_counter() - start
+        return result
+    
+    def metrics(self) -> dict:
+        list_sizes = [len(members) for members in self.lists] or [0]
+        return {
+            **super().metrics(),
+            "n_lists": len(self.lists),
+            "n_probe": self.n_probe,
+            "train_seconds": self.train_seconds,
+            "list_size_min": int(min(list_sizes)),
+            "list_size_max": int(max(list_sizes)),
+            "list_size_mean": float(np.mean(list_sizes)),
+            "candidates_per_query": self.candidates_scanned / self.query_count if self.query_count else 0.0,
+        }
+
+
+ENGINES = {
+    ExactIndex.name: ExactIndex,
+    SklearnIndex.name: SklearnIndex,
+    IVFIndex.name: IVFIndex,
+}
+
+
+def create_index(engine: str, **params):
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown matching engine '{engine}'. Available: {', '.join(sorted(ENGINES))}")
+    return ENGINES[engine](**params)
@@ -1,19 +1,210 @@
+import fcntl
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
 import numpy as np
-from typing import List, Tuple, Optional, Union
-from sklearn.neighbors import NearestNeighbors
+from typing import Dict, List, Set, Tuple, Optional, Union
 from sklearn.preprocessing import StandardScaler
+from sqlalchemy import func, type_coerce
+from sqlalchemy.types import LargeBinary
 from sqlalchemy.orm import Session
-from backend.models import Fragrance
+from backend.models import Fragrance, TrainingData
+from backend.ml_index import create_index, grow_rows
+from backend.neighbours import NEIGHBOUR_COUNT, NeighbourTable, build_neighbour_table
+from backend.vector_codec import unpack_vectors
 import json
 
+DEFAULT_ENGINE = os.environ.get("SCENT_MODEL_ENGINE", "numpy")
+DRIFT_THRESHOLD = float(os.environ.get("SCENT_MODEL_DRIFT_THRESHOLD", 0.05))
+PROTOTYPES_PER_FRAGRANCE = int(os.environ.get("SCENT_MODEL_PROTOTYPES", 4))
+SNAPSHOT_DIR = os.environ.get("SCENT_MODEL_SNAPSHOT_DIR", "./model_snapshot")
+SNAPSHOT_FORMAT = 3
+SNAPSHOT_METADATA = "metadata.json"
+SNAPSHOT_LOCK = ".lock"
+
+NOTE_MAPPINGS = {
+    'citrus': [0, 1],
+    'lemon': [0],
+    'bergamot': [0, 1],
+    'orange': [1],
+    'grapefruit': [0, 1],
+    'floral': [2, 3],
+    'rose': [2],
+    'jasmine': [2, 3],
+    'lavender': [3],
+    'violet': [2],
+    'woody': [4, 5],
+    'sandalwood': [4],
+    'cedar': [5],
+    'oud': [4, 5],
+    'vetiver': [5],
+    'spicy': [6, 7],
+    'pepper': [6],
+    'cinnamon': [7],
+    'cardamom': [6, 7],
+    'vanilla': [8, 9],
+    'amber': [8],
+    'musk': [9],
+    'fresh': [10, 11],
+    'aquatic': [10],
+    'marine': [10, 11],
+    'green': [11],
+    'fruity': [12, 13],
+    'apple': [12],
+    'peach': [13],
+    'berry': [12, 13],
+    'oriental': [14, 15],
+    'incense': [14],
+    'tobacco': [15],
+    'leather': [14, 15],
+}
+NOTE_KEYS = list(NOTE_MAPPINGS)
+NOTE_MATRIX = np.array([[int(d in NOTE_MAPPINGS[key]) for d in range(16)] for key in NOTE_KEYS], dtype=np.int64)
+TIER_WEIGHTS = (("top_notes", 1.0), ("mid_notes", 0.8), ("base_notes", 0.6))
+
+
+class NoteVocabulary:
+    def __init__(self, note_matrix: np.ndarray = NOTE_MATRIX):
+        self.note_matrix = note_matrix
+        self._tokens: Dict[str, int] = {}
+        self._dimensions: List[np.ndarray] = []
+        self._arrays = None
+        self._lock = threading.Lock()
+    
+    def token(self, note: str) -> int:
+        token = self._tokens.get(note)
+        if token is None:
+            note_lower = note.lower()
+            matched = np.array([key in note_lower for key in NOTE_KEYS])
+            counts = self.note_matrix[matched].sum(axis=0)
+            with self._lock:
+                token = self._tokens.get(note)
+                if token is None:
+                    token = len(self._dimensions)
+                    self._dimensions.append(np.repeat(np.arange(len(counts)), counts))
+                    self._tokens[note] = token
+                    self._arrays = None
+        return token
+    
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        arrays = self._arrays
+        if arrays is None:
+            with self._lock:
+                lengths = np.array([len(d) for d in self._dimensions], dtype=np.int64)
+                starts = np.cumsum(lengths) - lengths
+                flat = np.concatenate(self._dimensions) if self._dimensions else np.empty(0, dtype=np.int64)
+                arrays = self._arrays = (lengths, starts, flat)
+        return arrays
+
+
+note_vocabulary = NoteVocabulary()
+
+
+def catalog_version(db: Session) -> str:
+    count, last_updated = db.query(
+        func.count(Fragrance.id),
+        func.max(Fragrance.updated_at)
+    ).filter(Fragrance.voc_signature_vector.isnot(None)).one()
+    samples, last_sample = db.query(
+        func.count(TrainingData.id),
+        func.max(TrainingData.created_at)
+    ).filter(TrainingData.verified.is_(True)).one()
+    return (
+        f"{count}:{last_updated.isoformat() if last_updated else ''}"
+        f"|{samples}:{last_sample.isoformat() if last_sample else ''}"
+    )
+
+
+@contextmanager
+def snapshot_lock(path: str, exclusive: bool):
+    with open(os.path.join(path, SNAPSHOT_LOCK), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def default_index_params(engine: str) -> dict:
+    if engine != "ivf":
+        return {}
+    params = {"n_probe": int(os.environ.get("SCENT_IVF_PROBE", 8))}
+    if os.environ.get("SCENT_IVF_LISTS"):
+        params["n_lists"] = int(os.environ["SCENT_IVF_LISTS"])
+    return params
+
+
+def compress_prototypes(samples: np.ndarray, groups: np.ndarray, k: int, iterations: int = 10,
+                        seed: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    order = np.lexsort((rng.random(len(samples)), groups))
+    samples, groups = samples[order], groups[order]
+    unique_groups, group_counts = np.unique(groups, return_counts=True)
+    
+    large_groups = unique_groups[group_counts > k]
+    large_rows = np.isin(groups, large_groups)
+    prototypes = [samples[~large_rows]]
+    prototype_groups = [groups[~large_rows]]
+    prototype_counts = [np.ones(int((~large_rows).sum()), dtype=np.int64)]
+    
+    if len(large_groups):
+        large_samples = samples[large_rows]
+        local_groups = np.searchsorted(large_groups, groups[large_rows])
+        starts = np.concatenate(([0], np.cumsum(group_counts[group_counts > k])[:-1]))
+        centroids = large_samples[starts[:, None] + np.arange(k)].reshape(-1, samples.shape[1])
+        
+        for iteration in range(iterations + 1):
+            distances = np.empty((len(large_samples), k))
+            for j in range(k):
+                difference = large_samples - centroids[local_groups * k + j]
+                distances[:, j] = np.einsum('ij,ij->i', difference, difference)
+            labels = local_groups * k + distances.argmin(axis=1)
+            counts = np.bincount(labels, minlength=len(centroids))
+            if iteration == iterations:
+                break
+            sums = np.stack([
+                np.bincount(labels, weights=large_samples[:, dim], minlength=len(centroids))
+                for dim in range(samples.shape[1])
+            ], axis=1)
+            occupied = counts > 0
+            centroids[occupied] = sums[occupied] / counts[occupied, None]
+        
+        occupied = counts > 0
+        prototypes.append(centroids[occupied])
+        prototype_groups.append(np.repeat(large_groups, k)[occupied])
+        prototype_counts.append(counts[occupied])
+    
+    return np.concatenate(prototypes), np.concatenate(prototype_groups), np.concatenate(prototype_counts)
+
 
 class ScentRecognitionModel:
-    def __init__(self):
+    def __init__(self, engine: Optional[str] = None, index_params: Optional[dict] = None):
+        self.engine = engine or DEFAULT_ENGINE
+        self.index_params = index_params if index_params is not None else default_index_params(self.engine)
         self.scaler = StandardScaler()
-        self.nn_model = None
+        self.index = None
         self.fragrance_ids = []
         self.is_fitted = False
         self.vector_size = 16
+        self.drift_threshold = DRIFT_THRESHOLD
+        self.n_prototypes = PROTOTYPES_PER_FRAGRANCE
+        self.last_fit_report: Optional[dict] = None
+        self._vectors = np.empty((0, self.vector_size), dtype=np.float32)
+        self._positions: Dict[str, List[int]] = {}
+        self._sampled: Set[str] = set()
+        self._row_counts = np.empty(0)
+        self._stats_sum = np.zeros(self.vector_size)
+        self._stats_sum_sq = np.zeros(self.vector_size)
+        self.incremental_updates = 0
+        self.rebuilds = 0
+        self.version = 0
+        self.catalog_version: Optional[str] = None
+        self.lock = threading.RLock()
+        self.prediction_cache = None
+        self.calibration = None
+        self.neighbours: Optional[NeighbourTable] = None
     
     def _parse_vector(self, raw_vector: Union[str, List[float], None]) -> Optional[List[float]]:
         if raw_vector is None:
@@ -32,7 +223,9 @@ class ScentRecognitionModel:
                 return None
         return None
     
-    def preprocess_voc_vector(self, raw_vector: Union[str, List[float]]) -> Optional[np.ndarray]:
+    def preprocess_voc_vector(self, raw_vector: Union[str, List[float]], device_id: Optional[str] = None,
+                              temperature: Optional[float] = None,
+                              humidity: Optional[float] = None) -> Optional[np.ndarray]:
         parsed = self._parse_vector(raw_vector)
         if parsed is None:
             return None
@@ -44,6 +237,9 @@ class ScentRecognitionModel:
         elif len(vector) > self.vector_size:
             vector = vector[:self.vector_size]
         
+        if self.calibration is not None and device_id is not None:
+            vector = self.calibration.apply(vector.reshape(1, -1), [device_id], [temperature], [humidity])[0]
+        
         vector = np.clip(vector, 0, 10000)
         
         if np.max(vector) > 0:
@@ -51,128 +247,518 @@ class ScentRecognitionModel:
         
         return vector
     
+    def preprocess_voc_batch(self, raw_vectors: List[Union[str, List[float]]],
+                             device_ids: Optional[List[Optional[str]]] = None,
+                             temperatures: Optional[List[Optional[float]]] = None,
+                             humidities: Optional[List[Optional[float]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        matrix = np.zeros((len(raw_vectors), self.vector_size), dtype=np.float32)
+        valid = np.zeros(len(raw_vectors), dtype=bool)
+        
+        for i, raw_vector in enumerate(raw_vectors):
+            parsed = self._parse_vector(raw_vector)
+            if parsed is None:
+                continue
+            parsed = parsed[:self.vector_size]
+            matrix[i, :len(parsed)] = parsed
+            valid[i] = True
+        
+        if self.calibration is not None and device_ids is not None:
+            self.calibration.apply(matrix, device_ids, temperatures, humidities)
+        
+        return self.preprocess_matrix(matrix), valid
+    
+    def preprocess_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        np.clip(matrix, 0, 10000, out=matrix)
+        
+        row_max = matrix.max(axis=1, keepdims=True)
+        np.divide(matrix, row_max, out=matrix, where=row_max > 0)
+        
+        return matrix
+    
     def fit(self, db: Session):
-        fragrances = db.query(Fragrance).filter(
+        start = time.perf_counter()
+        samples = db.query(TrainingData.fragrance_id, type_coerce(TrainingData.voc_vector, LargeBinary)).filter(
+            TrainingData.verified.is_(True)
+        ).all()
+        signatures = db.query(Fragrance.id, type_coerce(Fragrance.voc_signature_vector, LargeBinary)).filter(
             Fragrance.voc_signature_vector.isnot(None)
         ).all()
         
-        if len(fragrances) < 2:
-            self.is_fitted = False
-            return False
+        sample_matrix, valid = unpack_vectors([vector for _, vector in samples], self.vector_size)
+        self.preprocess_matrix(sample_matrix)
+        sample_ids = np.array([fragrance_id for fragrance_id, _ in samples], dtype=object)[valid]
+        trained_ids, sample_groups = np.unique(sample_ids.astype(str), return_inverse=True)
+        prototypes, prototype_groups, prototype_counts = compress_prototypes(
+            sample_matrix[valid], sample_groups, self.n_prototypes
+        )
         
-        vectors = []
-        self.fragrance_ids = []
+        trained = set(trained_ids.tolist())
+        fallback = [(fragrance_id, vector) for fragrance_id, vector in signatures if fragrance_id not in trained]
+        fallback_matrix, fallback_valid = unpack_vectors([vector for _, vector in fallback], self.vector_size)
+        self.preprocess_matrix(fallback_matrix)
+        
+        X = np.concatenate([prototypes, fallback_matrix[fallback_valid]])
+        fragrance_ids = trained_ids[prototype_groups].tolist() + [
+            fragrance_id for (fragrance_id, _), is_valid in zip(fallback, fallback_valid) if is_valid
+        ]
         
-        for fragrance in fragrances:
-            if fragrance.voc_signature_vector:
-                vector = self.preprocess_voc_vector(fragrance.voc_signature_vector)
-                if vector is not None:
-                    vectors.append(vector)
-                    self.fragrance_ids.append(fragrance.id)
+        counts = np.concatenate([prototype_counts, np.ones(int(fallback_valid.sum()))])
         
-        if len(vectors) < 2:
+        fitted = self.fit_vectors(X, fragrance_ids, counts)
+        self._sampled = trained
+        self.last_fit_report = {
+            "samples_ingested": int(valid.sum()),
+            "fragrances_from_samples": len(trained_ids),
+            "fragrances_from_signatures": int(fallback_valid.sum()),
+            "prototypes_kept": len(prototypes),
+            "vectors_indexed": len(X),
+            "fit_seconds": time.perf_counter() - start,
+        }
+        return fitted
+    
+    def fit_vectors(self, X: np.ndarray, fragrance_ids: List[str], counts: Optional[np.ndarray] = None) -> bool:
+        X = np.array(X, dtype=np.float32).reshape(-1, self.vector_size)
+        self._vectors = X
+        self._row_counts = np.ones(len(X)) if counts is None else np.array(counts, dtype=np.float64)
+        self.fragrance_ids = list(fragrance_ids)
+        self._positions = {}
+        for position, fragrance_id in enumerate(self.fragrance_ids):
+            self._positions.setdefault(fragrance_id, []).append(position)
+        self._stats_sum = X.sum(axis=0, dtype=np.float64)
+        self._stats_sum_sq = np.square(X, dtype=np.float64).sum(axis=0)
+        
+        if len(X) < 2:
+            self.index = None
             self.is_fitted = False
             return False
         
-        X = np.array(vectors)
-        
         self.scaler.fit(X)
-        X_scaled = self.scaler.transform(X)
         
-        n_neighbors = min(5, len(vectors))
-        self.nn_model = NearestNeighbors(n_neighbors=n_neighbors, metric='cosine')
-        self.nn_model.fit(X_scaled)
+        self.index = create_index(self.engine, **self.index_params)
+        self.index.build(X, self.scaler.mean_, self.scaler.scale_)
         
         self.is_fitted = True
         return True
     
-    def predict(self, voc_vector: Union[str, List[float]], top_k: int = 5) -> List[Tuple[str, float]]:
-        if not self.is_fitted or self.nn_model is None:
-            return []
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:len(self.fragrance_ids)]
+    
+    def _live_statistics(self) -> Tuple[np.ndarray, np.ndarray]:
+        count = max(len(self.fragrance_ids), 1)
+        mean = self._stats_sum / count
+        var = np.maximum(self._stats_sum_sq / count - np.square(mean), 0)
+        scale = np.sqrt(var)
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+        return mean, scale
+    
+    def scaler_drift(self) -> float:
+        if not self.is_fitted:
+            return 0.0
+        mean, scale = self._live_statistics()
+        mean_shift = np.abs(mean - self.scaler.mean_) / self.scaler.scale_
+        scale_change = np.abs(scale / self.scaler.scale_ - 1)
+        return float(max(mean_shift.max(), scale_change.max()))
+    
+    def rebuild(self):
+        mean, scale = self._live_statistics()
+        self.scaler.mean_ = mean
+        self.scaler.scale_ = scale
+        self.scaler.var_ = np.square(scale)
+        self.scaler.n_samples_seen_ = len(self.fragrance_ids)
         
-        processed = self.preprocess_voc_vector(voc_vector)
-        if processed is None:
-            return []
+        self.index = create_index(self.engine, **self.index_params)
+        self.index.build(self.vectors, self.scaler.mean_, self.scaler.scale_)
+        self.rebuilds += 1
+    
+    def _add_rows(self, fragrance_id: str, rows: np.ndarray):
+        first = len(self.fragrance_ids)
+        self._vectors = grow_rows(self._vectors, first + len(rows))
+        self._vectors[first:first + len(rows)] = rows
+        self._row_counts = grow_rows(self._row_counts, first + len(rows))
+        self._row_counts[first:first + len(rows)] = 1
+        self.fragrance_ids.extend([fragrance_id] * len(rows))
+        self._positions.setdefault(fragrance_id, []).extend(range(first, first + len(rows)))
+        self._stats_sum += rows.sum(axis=0, dtype=np.float64)
+        self._stats_sum_sq += np.square(rows, dtype=np.float64).sum(axis=0)
+        
+        if self.is_fitted and self.index.supports_updates:
+            self.index.add(rows)
+    
+    def _remove_rows(self, fragrance_id: str):
+        self._sampled.discard(fragrance_id)
+        self._vectors = grow_rows(self._vectors, len(self.fragrance_ids))
+        self._row_counts = grow_rows(self._row_counts, len(self.fragrance_ids))
+        
+        for position in sorted(self._positions.pop(fragrance_id), reverse=True):
+            last = len(self.fragrance_ids) - 1
+            row = self._vectors[position].astype(np.float64)
+            self._stats_sum -= row
+            self._stats_sum_sq -= np.square(row)
             
-        processed = processed.reshape(1, -1)
+            if position != last:
+                moved_id = self.fragrance_ids[last]
+                self._vectors[position] = self._vectors[last]
+                self._row_counts[position] = self._row_counts[last]
+                self.fragrance_ids[position] = moved_id
+                moved_positions = self._positions[moved_id]
+                moved_positions[moved_positions.index(last)] = position
+            self.fragrance_ids.pop()
+            
+            if self.is_fitted and self.index.supports_updates:
+                self.index.remove(position)
+    
+    def _apply_update(self):
+        self.incremental_updates += 1
         
-        scaled = self.scaler.transform(processed)
+        if len(self.fragrance_ids) < 2:
+            self.index = None
+            self.is_fitted = False
+        elif not self.is_fitted:
+            self.fit_vectors(self.vectors, self.fragrance_ids, self._row_counts[:len(self.fragrance_ids)])
+        elif self.scaler_drift() > self.drift_threshold:
+            self.rebuild()
+        elif not self.index.supports_updates:
+            self.index.build(self.vectors, self.scaler.mean_, self.scaler.scale_)
+    
+    def add_fragrance(self, fragrance_id: str, voc_vector: Union[str, List[float]]) -> bool:
+        vector = self.preprocess_voc_vector(voc_vector)
+        if vector is None:
+            return False
         
-        distances, indices = self.nn_model.kneighbors(scaled)
+        with self.lock:
+            if fragrance_id in self._positions:
+                self._remove_rows(fragrance_id)
+            self._add_rows(fragrance_id, vector.reshape(1, -1))
+            self._apply_update()
+        return True
+    
+    def update_fragrance(self, fragrance_id: str, voc_vector: Union[str, List[float]]) -> bool:
+        return self.add_fragrance(fragrance_id, voc_vector)
+    
+    def _merge_sample(self, position: int, vector: np.ndarray):
+        count = self._row_counts[position]
+        old = self._vectors[position].astype(np.float64)
+        new = old + (vector - old) / (count + 1)
+        self._stats_sum += new - old
+        self._stats_sum_sq += np.square(new) - np.square(old)
+        self._vectors[position] = new
+        self._row_counts[position] = count + 1
+        
+        if self.is_fitted and self.index.supports_updates:
+            self.index.update(position, self._vectors[position])
+    
+    def add_samples(self, fragrance_ids: List[str], voc_vectors: List[Union[str, List[float]]]) -> int:
+        processed, valid = self.preprocess_voc_batch(voc_vectors)
+        applied = 0
         
+        with self.lock:
+            self._vectors = grow_rows(self._vectors, len(self.fragrance_ids))
+            self._row_counts = grow_rows(self._row_counts, len(self.fragrance_ids))
+            
+            for fragrance_id, vector, is_valid in zip(fragrance_ids, processed, valid):
+                if not is_valid:
+                    continue
+                if fragrance_id not in self._sampled:
+                    if fragrance_id in self._positions:
+                        self._remove_rows(fragrance_id)
+                    self._sampled.add(fragrance_id)
+                positions = self._positions.get(fragrance_id, [])
+                if len(positions) < self.n_prototypes:
+                    self._add_rows(fragrance_id, vector.reshape(1, -1))
+                else:
+                    distances = np.square(self._vectors[positions] - vector).sum(axis=1)
+                    self._merge_sample(positions[int(np.argmin(distances))], vector)
+                applied += 1
+            
+            if applied:
+                self._apply_update()
+        return applied
+    
+    def remove_fragrance(self, fragrance_id: str) -> bool:
+        with self.lock:
+            if fragrance_id not in self._positions:
+                return False
+            
+            self._remove_rows(fragrance_id)
+            self._apply_update()
+        return True
+    
+    def _search_k(self, top_k: int) -> int:
+        if len(self.fragrance_ids) > len(self._positions):
+            return top_k * self.n_prototypes
+        return top_k
+    
+    def _results(self, similarities: np.ndarray, indices: np.ndarray, top_k: int) -> List[Tuple[str, float]]:
         results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            confidence = max(0, 1 - dist)
+        seen = set()
+        for similarity, idx in zip(similarities, indices):
+            if idx < 0:
+                continue
             fragrance_id = self.fragrance_ids[idx]
-            results.append((fragrance_id, float(confidence)))
-        
-        return results[:top_k]
-    
-    def generate_synthetic_vector(self, notes_profile: dict) -> List[float]:
-        vector = np.zeros(self.vector_size)
-        
-        note_mappings = {
-            'citrus': [0, 1],
-            'lemon': [0],
-            'bergamot': [0, 1],
-            'orange': [1],
-            'grapefruit': [0, 1],
-            'floral': [2, 3],
-            'rose': [2],
-            'jasmine': [2, 3],
-            'lavender': [3],
-            'violet': [2],
-            'woody': [4, 5],
-            'sandalwood': [4],
-            'cedar': [5],
-            'oud': [4, 5],
-            'vetiver': [5],
-            'spicy': [6, 7],
-            'pepper': [6],
-            'cinnamon': [7],
-            'cardamom': [6, 7],
-            'vanilla': [8, 9],
-            'amber': [8],
-            'musk': [9],
-            'fresh': [10, 11],
-            'aquatic': [10],
-            'marine': [10, 11],
-            'green': [11],
-            'fruity': [12, 13],
-            'apple': [12],
-            'peach': [13],
-            'berry': [12, 13],
-            'oriental': [14, 15],
-            'incense': [14],
-            'tobacco': [15],
-            'leather': [14, 15],
+            if fragrance_id in seen:
+                continue
+            seen.add(fragrance_id)
+            results.append((fragrance_id, float(max(0.0, similarity))))
+            if len(results) == top_k:
+                break
+        return results
+    
+    def predict(self, voc_vector: Union[str, List[float]], top_k: int = 5, device_id: Optional[str] = None,
+                temperature: Optional[float] = None, humidity: Optional[float] = None) -> List[Tuple[str, float]]:
+        if not self.is_fitted or self.index is None:
+            return []
+        
+        processed = self.preprocess_voc_vector(voc_vector, device_id, temperature, humidity)
+        if processed is None:
+            return []
+        
+        cache = self.prediction_cache
+        if cache is not None:
+            key = cache.make_key(self.version, processed, top_k)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        
+        with self.lock:
+            if not self.is_fitted:
+                return []
+            similarities, indices = self.index.search(processed.reshape(1, -1), self._search_k(top_k))
+            results = self._results(similarities[0], indices[0], top_k)
+        
+        if cache is not None:
+            cache.put(key, results)
+        return results
+    
+    def predict_batch(self, voc_vectors: List[Union[str, List[float]]], top_k: int = 5,
+                      device_ids: Optional[List[Optional[str]]] = None,
+                      temperatures: Optional[List[Optional[float]]] = None,
+                      humidities: Optional[List[Optional[float]]] = None) -> List[List[Tuple[str, float]]]:
+        results = [[] for _ in voc_vectors]
+        if not self.is_fitted or self.index is None or not voc_vectors:
+            return results
+        
+        processed, valid = self.preprocess_voc_batch(voc_vectors, device_ids, temperatures, humidities)
+        rows = np.flatnonzero(valid)
+        
+        cache = self.prediction_cache
+        keys = {}
+        if cache is not None:
+            pending = []
+            for row in rows:
+                keys[row] = cache.make_key(self.version, processed[row], top_k)
+                cached = cache.get(keys[row])
+                if cached is not None:
+                    results[row] = cached
+                else:
+                    pending.append(row)
+            rows = np.array(pending, dtype=np.int64)
+        
+        if len(rows) == 0:
+            return results
+        
+        with self.lock:
+            if not self.is_fitted:
+                return results
+            similarities, indices = self.index.search(processed[rows], self._search_k(top_k))
+            for row, row_similarities, row_indices in zip(rows, similarities, indices):
+                results[row] = self._results(row_similarities, row_indices, top_k)
+        
+        if cache is not None:
+            for row in rows:
+                cache.put(keys[row], results[row])
+        return results
+    
+    def build_neighbours(self, k: int = NEIGHBOUR_COUNT) -> Optional[NeighbourTable]:
+        with self.lock:
+            if not self.is_fitted:
+                self.neighbours = None
+                return None
+            vectors = np.array(self.vectors)
+            row_counts = np.array(self._row_counts[:len(self.fragrance_ids)])
+            fragrance_ids = list(self.fragrance_ids)
+            mean, scale = self.scaler.mean_.copy(), self.scaler.scale_.copy()
+        self.neighbours = build_neighbour_table(vectors, row_counts, fragrance_ids, mean, scale, k)
+        return self.neighbours
+    
+    def similar(self, fragrance_id: str, top_k: int = NEIGHBOUR_COUNT) -> List[Tuple[str, float]]:
+        neighbours = self.neighbours
+        if neighbours is not None and fragrance_id in neighbours:
+            return neighbours.lookup(fragrance_id)[:top_k]
+        
+        with self.lock:
+            positions = self._positions.get(fragrance_id)
+            if not self.is_fitted or not positions:
+                return []
+            weights = self._row_counts[positions]
+            centroid = np.average(self._vectors[positions], axis=0, weights=weights).astype(np.float32)
+            similarities, indices = self.index.search(centroid.reshape(1, -1), self._search_k(top_k + 1))
+            results = self._results(similarities[0], indices[0], top_k + 1)
+        return [(neighbour_id, similarity) for neighbour_id, similarity in results if neighbour_id != fragrance_id][:top_k]
+    
+    def save_snapshot(self, path: str, version: Optional[str] = None):
+        state = self.snapshot_state(version)
+        if state is not None:
+            self.write_snapshot(path, *state)
+    
+    def snapshot_state(self, version: Optional[str] = None) -> Optional[Tuple[dict, dict]]:
+        with self.lock:
+            if not self.is_fitted:
+                return None
+            arrays = {
+                "vectors": np.array(self.vectors),
+                "row_counts": np.array(self._row_counts[:len(self.fragrance_ids)]),
+                "fragrance_ids": np.array(self.fragrance_ids, dtype=str),
+                "sampled_ids": np.array(sorted(self._sampled), dtype=str),
+            }
+            for key, array in self.index.state().items():
+                arrays[f"index.{key}"] = np.array(array)
+            if self.neighbours is not None:
+                for key, array in self.neighbours.state().items():
+                    arrays[f"neighbours.{key}"] = array
+            metadata = {
+                "format": SNAPSHOT_FORMAT,
+                "catalog_version": version if version is not None else self.catalog_version,
+                "engine": self.engine,
+                "index_params": self.index_params,
+                "scaler_mean": self.scaler.mean_.tolist(),
+                "scaler_scale": self.scaler.scale_.tolist(),
+                "stats_sum": self._stats_sum.tolist(),
+                "stats_sum_sq": self._stats_sum_sq.tolist(),
+                "fit_report": self.last_fit_report,
+            }
+        return arrays, metadata
+    
+    def write_snapshot(self, path: str, arrays: dict, metadata: dict):
+        os.makedirs(path, exist_ok=True)
+        with snapshot_lock(path, exclusive=True):
+            self._write_snapshot(path, arrays, metadata)
+    
+    def _write_snapshot(self, path: str, arrays: dict, metadata: dict):
+        token = uuid.uuid4().hex
+        files = {}
+        for key, array in arrays.items():
+            files[key] = f"{key}-{token}.npy"
+            np.save(os.path.join(path, files[key]), np.ascontiguousarray(array))
+        
+        metadata = {**metadata, "files": files}
+        metadata_path = os.path.join(path, SNAPSHOT_METADATA)
+        with open(f"{metadata_path}.{token}", "w") as f:
+            json.dump(metadata, f)
+        os.replace(f"{metadata_path}.{token}", metadata_path)
+        
+        current = set(files.values())
+        for name in os.listdir(path):
+            if name.endswith(".npy") and name not in current:
+                try:
+                    os.remove(os.path.join(path, name))
+                except OSError:
+                    pass
+    
+    def load_snapshot(self, path: str, version: Optional[str] = None) -> bool:
+        try:
+            with snapshot_lock(path, exclusive=False):
+                with open(os.path.join(path, SNAPSHOT_METADATA)) as f:
+                    metadata = json.load(f)
+                if metadata.get("format") != SNAPSHOT_FORMAT:
+                    return False
+                if version is not None and metadata["catalog_version"] != version:
+                    return False
+                
+                files = metadata["files"]
+                arrays = {
+                    key: np.load(os.path.join(path, filename), mmap_mode='r')
+                    for key, filename in files.items()
+                }
+        except (OSError, ValueError, KeyError):
+            return False
+        
+        self._vectors = arrays["vectors"]
+        self._row_counts = arrays["row_counts"]
+        self.fragrance_ids = arrays["fragrance_ids"].tolist()
+        self._positions = {}
+        for position, fragrance_id in enumerate(self.fragrance_ids):
+            self._positions.setdefault(fragrance_id, []).append(position)
+        self._sampled = set(arrays["sampled_ids"].tolist()) if "sampled_ids" in arrays else set()
+        self._stats_sum = np.array(metadata["stats_sum"])
+        self._stats_sum_sq = np.array(metadata["stats_sum_sq"])
+        self.last_fit_report = metadata.get("fit_report")
+        
+        self.scaler.mean_ = np.array(metadata["scaler_mean"])
+        self.scaler.scale_ = np.array(metadata["scaler_scale"])
+        self.scaler.var_ = np.square(self.scaler.scale_)
+        self.scaler.n_features_in_ = self.vector_size
+        self.scaler.n_samples_seen_ = len(self.fragrance_ids)
+        
+        self.index = create_index(self.engine, **self.index_params)
+        index_state = {
+            key[len("index."):]: array
+            for key, array in arrays.items() if key.startswith("index.")
         }
+        if metadata["engine"] == self.engine and metadata["index_params"] == self.index_params and index_state:
+            self.index.load_state(index_state, self.scaler.mean_, self.scaler.scale_)
+        else:
+            self.index.build(self.vectors, self.scaler.mean_, self.scaler.scale_)
         
-        all_notes = []
-        if notes_profile.get('top_notes'):
-            all_notes.extend([(n, 1.0) for n in notes_profile['top_notes']])
-        if notes_profile.get('mid_notes'):
-            all_notes.extend([(n, 0.8) for n in notes_profile['mid_notes']])
-        if notes_profile.get('base_notes'):
-            all_notes.extend([(n, 0.6) for n in notes_profile['base_notes']])
+        self.is_fitted = True
         
-        for note, weight in all_notes:
-            note_lower = note.lower()
-            for key, indices in note_mappings.items():
-                if key in note_lower:
-                    for idx in indices:
-                        vector[idx] += weight * np.random.uniform(0.5, 1.0)
+        neighbour_state = {
+            key[len("neighbours."):]: array
+            for key, array in arrays.items() if key.startswith("neighbours.")
+        }
+        self.neighbours = NeighbourTable.from_state(neighbour_state) if neighbour_state else None
+        return True
+    
+    def metrics(self) -> dict:
+        return {
+            "is_fitted": self.is_fitted,
+            "version": self.version,
+            "engine": self.engine,
+            "fragrance_count": len(self._positions),
+            "vector_count": len(self.fragrance_ids),
+            "incremental_updates": self.incremental_updates,
+            "rebuilds": self.rebuilds,
+            "scaler_drift": self.scaler_drift(),
+            "last_fit": self.last_fit_report,
+            "index": self.index.metrics() if self.index is not None else None,
+            "neighbours": self.neighbours.metrics() if self.neighbours is not None else None,
+        }
+    
+    def generate_synthetic_vectors(self, notes_profiles: List[dict],
+                                   rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        rng = rng if rng is not None else np.random.default_rng()
+        vectors = np.zeros((len(notes_profiles), self.vector_size))
         
-        vector += np.random.uniform(0, 0.1, self.vector_size)
+        token = note_vocabulary.token
+        rows, tokens, weights = [], [], []
+        for row, notes_profile in enumerate(notes_profiles):
+            for tier, weight in TIER_WEIGHTS:
+                for note in notes_profile.get(tier) or ():
+                    rows.append(row)
+                    tokens.append(token(note))
+                    weights.append(weight)
         
-        if np.max(vector) > 0:
-            vector = vector / np.max(vector)
+        if tokens:
+            lengths, starts, flat_dimensions = note_vocabulary.arrays()
+            tokens = np.array(tokens, dtype=np.int64)
+            counts = lengths[tokens]
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            dimensions = flat_dimensions[np.repeat(starts[tokens], counts) + offsets]
+            rows = np.repeat(np.array(rows, dtype=np.int64), counts)
+            contributions = np.repeat(np.array(weights), counts) * rng.uniform(0.5, 1.0, len(rows))
+            vectors += np.bincount(
+                rows * self.vector_size + dimensions,
+                weights=contributions,
+                minlength=vectors.size
+            ).reshape(vectors.shape)
         
-        return vector.tolist()
-
-
-model = ScentRecognitionModel()
-
+        vectors += rng.uniform(0, 0.1, vectors.shape)
+        
+        row_max = vectors.max(axis=1, keepdims=True)
+        np.divide(vectors, row_max, out=vectors, where=row_max > 0)
+        
+        return vectors
+    
+    def generate_synthetic_vector(self, notes_profile: dict, rng: Optional[np.random.Generator] = None) -> List[float]:
+        return self.generate_synthetic_vectors([notes_profile], rng)[0].tolist()
 
-def get_model() -> ScentRecognitionModel:
-    return model
@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from typing import Callable, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.database import SessionLocal
+from backend.models import ModelRevision
+from backend.catalog import get_catalog
+from backend.calibration import get_calibration_table
+from backend.ml_model import ScentRecognitionModel, catalog_version, SNAPSHOT_DIR
+from backend.prediction_cache import PredictionCache
+
+REFRESH_INTERVAL_SECONDS = float(os.environ.get("SCENT_MODEL_REFRESH_SECONDS", 300))
+
+
+def model_revision(db: Session, stamp: str) -> int:
+    latest = db.query(ModelRevision.stamp).order_by(ModelRevision.id.desc()).first()
+    if latest is None or latest.stamp != stamp:
+        db.add(ModelRevision(stamp=stamp))
+        db.commit()
+    return db.query(func.max(ModelRevision.id)).filter(ModelRevision.stamp == stamp).scalar()
+
+
+class ModelRegistry:
+    def __init__(self):
+        self._model = ScentRecognitionModel()
+        self._version = 0
+        self._publish_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_requested = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._neighbour_lock = threading.Lock()
+        self._neighbour_thread: Optional[threading.Thread] = None
+        self.refresh_count = 0
+        self.last_refresh_seconds: Optional[float] = None
+        self.last_refresh_error: Optional[str] = None
+        self.prediction_cache = PredictionCache()
+    
+    @property
+    def model(self) -> ScentRecognitionModel:
+        return self._model
+    
+    @property
+    def version(self) -> int:
+        return self._version
+    
+    def publish(self, model: ScentRecognitionModel, revision: int) -> int:
+        with self._publish_lock:
+            self._version = revision
+            model.version = revision
+            model.prediction_cache = self.prediction_cache
+            model.calibration = get_calibration_table()
+            self._model = model
+            self.prediction_cache.invalidate()
+        get_catalog().invalidate()
+        return model.version
+    
+    def update(self, apply: Callable[[ScentRecognitionModel], object], base_version: Optional[str] = None) -> int:
+        with self._publish_lock:
+            model = self._model
+            db = SessionLocal()
+            try:
+                version = catalog_version(db)
+                revision = model_revision(db, f"{model.catalog_version}>{version}")
+            finally:
+                db.close()
+            with model.lock:
+                apply(model)
+                if base_version is not None and model.catalog_version == base_version:
+                    model.catalog_version = version
+                self._version = revision
+                model.version = revision
+                self.prediction_cache.invalidate()
+        return model.version
+    
+    def initialize(self) -> bool:
+        db = SessionLocal()
+        try:
+            version = catalog_version(db)
+            model = ScentRecognitionModel()
+            loaded = model.load_snapshot(SNAPSHOT_DIR, version)
+            if not loaded:
+                model.fit(db)
+                model.save_snapshot(SNAPSHOT_DIR, version)
+            model.catalog_version = version
+            revision = model_revision(db, version)
+        finally:
+            db.close()
+        
+        self.publish(model, revision)
+        self.build_neighbours()
+        return loaded
+    
+    def refresh(self, force: bool = False) -> bool:
+        with self._refresh_lock:
+            start = time.perf_counter()
+            db = SessionLocal()
+            try:
+                version = catalog_version(db)
+                current = self._model
+                if not force and current.is_fitted and current.catalog_version == version:
+                    return False
+                model = ScentRecognitionModel()
+                model.fit(db)
+                revision = model_revision(db, version)
+            finally:
+                db.close()
+            
+            model.catalog_version = version
+            model.save_snapshot(SNAPSHOT_DIR, version)
+            self.publish(model, revision)
+            self.refresh_count += 1
+            self.last_refresh_seconds = time.perf_counter() - start
+            self.last_refresh_error = None
+        self.build_neighbours()
+        return True
+    
+    def build_neighbours(self):
+        with self._neighbour_lock:
+            if self._neighbour_thread is None:
+                self._neighbour_thread = threading.Thread(
+                    target=self._run_neighbours, name="model-neighbours", daemon=True
+                )
+                self._neighbour_thread.start()
+    
+    def _run_neighbours(self):
+        while True:
+            with self._neighbour_lock:
+                model = self._model
+                if not model.is_fitted or model.neighbours is not None:
+                    self._neighbour_thread = None
+                    return
+            try:
+                model.build_neighbours()
+                with self._refresh_lock:
+                    if self._model is model:
+                        model.save_snapshot(SNAPSHOT_DIR)
+            except Exception as e:
+                print(f"Warning: Neighbour table build failed: {e}")
+                with self._neighbour_lock:
+                    self._neighbour_thread = None
+                return
+    
+    def request_refresh(self):
+        self._refresh_requested.set()
+    
+    def _run(self):
+        while not self._stopping.is_set():
+            self._refresh_requested.wait(REFRESH_INTERVAL_SECONDS)
+            if self._stopping.is_set():
+                break
+            force = self._refresh_requested.is_set()
+            self._refresh_requested.clear()
+            try:
+                self.refresh(force=force)
+            except Exception as e:
+                self.last_refresh_error = str(e)
+                print(f"Warning: Background model refresh failed: {e}")
+    
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="model-refresh", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stopping.set()
+        self._refresh_requested.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def metrics(self) -> dict:
+        return {
+            "version": self._version,
+            "catalog_version": self._model.catalog_version,
+            "refresh_count": self.refresh_count,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "last_refresh_error": self.last_refresh_error,
+            "neighbours_building": self._neighbour_thread is not None,
+            "prediction_cache": self.prediction_cache.metrics(),
+        }
+
+
+registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    return registry
+
+
+def get_model() -> ScentRecognitionModel:
+    return registry.model
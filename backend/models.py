@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Text, JSON, Boolean, Integer
+from sqlalchemy import Column, String, Float, DateTime, ForeignKey, Text, JSON, Boolean, Integer, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from backend.database import Base
+from backend.vector_codec import PackedVector
 
 
 def generate_uuid():
@@ -33,7 +34,7 @@ class Fragrance(Base):
     description = Column(Text)
     image_url = Column(String(500))
     
-    voc_signature_vector = Column(JSON)
+    voc_signature_vector = Column(PackedVector)
     
     top_notes = Column(JSON)
     mid_notes = Column(JSON)
@@ -68,15 +69,20 @@ class Scan(Base):
     user_id = Column(String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     fragrance_id = Column(String(36), ForeignKey("fragrances.id", ondelete="SET NULL"))
     
-    raw_voc_vector = Column(JSON, nullable=False)
+    raw_voc_vector = Column(PackedVector, nullable=False)
     confidence_score = Column(Float, nullable=False)
     
     alternative_matches = Column(JSON)
+    model_version = Column(Integer)
     
     scanned_at = Column(DateTime, default=datetime.utcnow)
     
     user = relationship("User", back_populates="scans")
     fragrance = relationship("Fragrance", back_populates="scans")
+    
+    __table_args__ = (
+        Index("ix_scans_user_scanned_at", "user_id", "scanned_at", "id"),
+    )
 
 
 class Favorite(Base):
@@ -104,6 +110,7 @@ class Feedback(Base):
     notes = Column(Text)
     
     created_at = Column(DateTime, default=datetime.utcnow)
+    processed_at = Column(DateTime)
     
     user = relationship("User", back_populates="feedback")
     fragrance = relationship("Fragrance", back_populates="feedback")
@@ -114,19 +121,63 @@ class SensorData(Base):
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     device_id = Column(String(100))
-    raw_readings = Column(JSON, nullable=False)
-    processed_vector = Column(JSON)
+    raw_readings = Column(PackedVector, nullable=False)
+    processed_vector = Column(PackedVector)
     temperature = Column(Float)
     humidity = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
 
+class SensorBucket(Base):
+    __tablename__ = "sensor_buckets"
+    
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    device_id = Column(String(100), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    frame_count = Column(Integer, nullable=False)
+    vector_size = Column(Integer, nullable=False)
+    
+    offsets = Column(LargeBinary, nullable=False)
+    readings = Column(LargeBinary, nullable=False)
+    temperatures = Column(LargeBinary, nullable=False)
+    humidities = Column(LargeBinary, nullable=False)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index("ux_sensor_buckets_device_bucket", "device_id", "bucket_start", unique=True),
+    )
+
+
+class DeviceCalibration(Base):
+    __tablename__ = "device_calibrations"
+    
+    device_id = Column(String(100), primary_key=True)
+    baseline = Column(PackedVector)
+    gain = Column(PackedVector)
+    temperature_coeff = Column(PackedVector)
+    humidity_coeff = Column(PackedVector)
+    reference_temperature = Column(Float, default=25.0)
+    reference_humidity = Column(Float, default=50.0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class TrainingData(Base):
     __tablename__ = "training_data"
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     fragrance_id = Column(String(36), ForeignKey("fragrances.id", ondelete="CASCADE"), nullable=False)
-    voc_vector = Column(JSON, nullable=False)
+    feedback_id = Column(String(36), ForeignKey("feedback.id", ondelete="CASCADE"), index=True)
+    voc_vector = Column(PackedVector, nullable=False)
     source = Column(String(50))
     verified = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ModelRevision(Base):
+    __tablename__ = "model_revisions"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    stamp = Column(String(255), nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
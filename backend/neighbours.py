@@ -0,0 +1,91 @@
+import os
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from backend.ml_index import SEARCH_BLOCK_ELEMENTS
+
+NEIGHBOUR_COUNT = int(os.environ.get("SCENT_SIMILAR_NEIGHBOURS", 32))
+
+
+def fragrance_centroids(vectors: np.ndarray, row_counts: np.ndarray,
+                        fragrance_ids: List[str]) -> Tuple[List[str], np.ndarray]:
+    unique_ids, groups = np.unique(np.array(fragrance_ids, dtype=str), return_inverse=True)
+    order = np.argsort(groups, kind="stable")
+    starts = np.r_[0, np.flatnonzero(np.diff(groups[order])) + 1]
+    weights = np.asarray(row_counts, dtype=np.float64)[order]
+    sums = np.add.reduceat(np.asarray(vectors, dtype=np.float64)[order] * weights[:, None], starts)
+    totals = np.add.reduceat(weights, starts)
+    return unique_ids.tolist(), (sums / np.maximum(totals, 1e-12)[:, None]).astype(np.float32)
+
+
+class NeighbourTable:
+    def __init__(self, fragrance_ids: List[str], neighbours: np.ndarray, similarities: np.ndarray,
+                 build_seconds: float = 0.0):
+        self.fragrance_ids = fragrance_ids
+        self.positions: Dict[str, int] = {fragrance_id: i for i, fragrance_id in enumerate(fragrance_ids)}
+        self.neighbours = neighbours
+        self.similarities = similarities
+        self.build_seconds = build_seconds
+    
+    def __len__(self) -> int:
+        return len(self.fragrance_ids)
+    
+    def __contains__(self, fragrance_id: str) -> bool:
+        return fragrance_id in self.positions
+    
+    def lookup(self, fragrance_id: str) -> Optional[List[Tuple[str, float]]]:
+        position = self.positions.get(fragrance_id)
+        if position is None:
+            return None
+        ids = self.fragrance_ids
+        return [
+            (ids[neighbour], max(0.0, similarity))
+            for neighbour, similarity in zip(self.neighbours[position].tolist(), self.similarities[position].tolist())
+        ]
+    
+    def state(self) -> dict:
+        return {
+            "fragrance_ids": np.array(self.fragrance_ids, dtype=str),
+            "ids": self.neighbours,
+            "similarities": self.similarities,
+        }
+    
+    @classmethod
+    def from_state(cls, state: dict) -> "NeighbourTable":
+        return cls(state["fragrance_ids"].tolist(), state["ids"], state["similarities"])
+    
+    def metrics(self) -> dict:
+        return {
+            "fragrances": len(self.fragrance_ids),
+            "neighbours": self.neighbours.shape[1] if self.neighbours.ndim == 2 else 0,
+            "bytes": int(self.neighbours.nbytes + self.similarities.nbytes),
+            "build_seconds": self.build_seconds,
+        }
+
+
+def build_neighbour_table(vectors: np.ndarray, row_counts: np.ndarray, fragrance_ids: List[str],
+                          mean: np.ndarray, scale: np.ndarray, k: int = NEIGHBOUR_COUNT) -> NeighbourTable:
+    start = time.perf_counter()
+    ids, centroids = fragrance_centroids(vectors, row_counts, fragrance_ids)
+    n = len(ids)
+    k = max(0, min(k, n - 1))
+    
+    matrix = ((centroids - mean) / scale).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    
+    neighbours = np.empty((n, k), dtype=np.int32)
+    similarities = np.empty((n, k), dtype=np.float16)
+    block_rows = max(1, SEARCH_BLOCK_ELEMENTS // max(n, 1))
+    for block_start in range(0, n if k else 0, block_rows):
+        block = matrix[block_start:block_start + block_rows]
+        rows = np.arange(len(block))
+        scores = block @ matrix.T
+        scores[rows, rows + block_start] = -np.inf
+        top = np.argpartition(scores, n - k, axis=1)[:, n - k:]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        neighbours[block_start:block_start + len(block)] = np.take_along_axis(top, order, axis=1)
+        similarities[block_start:block_start + len(block)] = np.take_along_axis(top_scores, order, axis=1)
+    
+    return NeighbourTable(ids, neighbours, similarities, time.perf_counter() - start)
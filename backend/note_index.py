@@ -0,0 +1,303 @@
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from backend.catalog import FragranceRecord, get_catalog
+from backend.ml_model import TIER_WEIGHTS
+
+DENSE_FRACTION = 1 / 32
+WHITESPACE = re.compile(r"\s+")
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.int64)
+TIER_NAMES = tuple(name for name, _ in TIER_WEIGHTS)
+TIER_POINTS = tuple(int(round(weight * 100)) for _, weight in TIER_WEIGHTS)
+
+
+def normalize_note(note: str) -> str:
+    return WHITESPACE.sub(" ", note.strip().lower())
+
+
+def parse_notes(values: Optional[Iterable[str]]) -> List[str]:
+    notes = []
+    for value in values or ():
+        for note in value.split(","):
+            note = normalize_note(note)
+            if note and note not in notes:
+                notes.append(note)
+    return notes
+
+
+def popcount(bitmap: np.ndarray) -> int:
+    return int(POPCOUNT[bitmap.view(np.uint8)].sum())
+
+
+def to_bitmap(positions: np.ndarray, size: int) -> np.ndarray:
+    bitmap = np.zeros((size + 63) // 64, dtype=np.uint64)
+    if len(positions):
+        word_idx = positions >> 6
+        bits = np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64))
+        starts = np.flatnonzero(np.r_[True, word_idx[1:] != word_idx[:-1]])
+        bitmap[word_idx[starts]] = np.bitwise_or.reduceat(bits, starts)
+    return bitmap
+
+
+def bitmap_positions(bitmap: np.ndarray, skip: int = 0, take: Optional[int] = None) -> np.ndarray:
+    nonzero = np.flatnonzero(bitmap)
+    if skip:
+        counts = np.cumsum(POPCOUNT[bitmap[nonzero].view(np.uint8)].reshape(-1, 8).sum(axis=1))
+        first = int(np.searchsorted(counts, skip, side="right"))
+        skip -= int(counts[first - 1]) if first else 0
+        nonzero = nonzero[first:]
+    if take is not None:
+        nonzero = nonzero[:skip + take]
+    bits = np.unpackbits(bitmap[nonzero].astype("<u8").view(np.uint8), bitorder="little").reshape(-1, 64)
+    rows, cols = np.nonzero(bits)
+    positions = nonzero[rows] * 64 + cols
+    return positions[skip:] if take is None else positions[skip:skip + take]
+
+
+class Postings:
+    __slots__ = ("positions", "tiers", "_bitmaps")
+    
+    def __init__(self, positions: np.ndarray, tiers: Optional[np.ndarray] = None):
+        self.positions = positions
+        self.tiers = tiers
+        self._bitmaps: Optional[Tuple[np.ndarray, ...]] = None
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    def _build(self, size: int) -> Tuple[np.ndarray, ...]:
+        if self.tiers is None:
+            return (to_bitmap(self.positions, size),)
+        tier_bitmaps = tuple(to_bitmap(self.positions[self.tiers == t], size) for t in range(len(TIER_POINTS)))
+        return (np.bitwise_or.reduce(tier_bitmaps),) + tier_bitmaps
+    
+    def bitmaps(self, size: int) -> Tuple[np.ndarray, ...]:
+        return self._bitmaps or self._build(size)
+    
+    def cache(self, size: int):
+        if len(self.positions) > size * DENSE_FRACTION:
+            self._bitmaps = self._build(size)
+    
+    @property
+    def is_dense(self) -> bool:
+        return self._bitmaps is not None
+    
+    @property
+    def nbytes(self) -> int:
+        total = self.positions.nbytes + (self.tiers.nbytes if self.tiers is not None else 0)
+        return total + sum(b.nbytes for b in self._bitmaps or ())
+
+
+def group_postings(labels: List[str], codes: np.ndarray, positions: np.ndarray,
+                   tiers: Optional[np.ndarray] = None) -> Dict[str, Postings]:
+    order = np.argsort(codes, kind="stable")
+    positions = positions[order]
+    tiers = tiers[order] if tiers is not None else None
+    bounds = np.r_[0, np.cumsum(np.bincount(codes, minlength=len(labels)))]
+    return {
+        label: Postings(positions[start:end], tiers[start:end] if tiers is not None else None)
+        for label, start, end in zip(labels, bounds[:-1].tolist(), bounds[1:].tolist())
+    }
+
+
+def encode(values: Iterable[str], codes: Dict[str, int]) -> np.ndarray:
+    return np.fromiter((codes.setdefault(value, len(codes)) for value in values), dtype=np.int32)
+
+
+class NoteIndex:
+    def __init__(self, records: Dict[str, FragranceRecord], version: int = 0):
+        self.version = version
+        ids = list(records)
+        ratings = np.fromiter((records[i].avg_rating for i in ids), dtype=np.float64, count=len(ids))
+        reviews = np.fromiter((records[i].review_count for i in ids), dtype=np.int64, count=len(ids))
+        self.ids = [ids[i] for i in np.lexsort((-reviews, -ratings)).tolist()]
+        self.positions = {fragrance_id: position for position, fragrance_id in enumerate(self.ids)}
+        self.size = len(self.ids)
+        self.universe = to_bitmap(np.arange(self.size, dtype=np.int64), self.size)
+        
+        note_keys: Dict[str, int] = {}
+        note_codes: Dict[str, int] = {}
+        notes, positions, tiers = [], [], []
+        brands, genders, concentrations = [], [], []
+        for position, fragrance_id in enumerate(self.ids):
+            record = records[fragrance_id]
+            seen = {}
+            for tier, name in enumerate(TIER_NAMES):
+                for note in getattr(record, name):
+                    key = note_keys.get(note)
+                    if key is None:
+                        key = note_keys[note] = note_codes.setdefault(normalize_note(note), len(note_codes))
+                    if key not in seen:
+                        seen[key] = tier
+            notes += seen
+            positions += [position] * len(seen)
+            tiers += seen.values()
+            brands.append(record.brand or "")
+            genders.append(record.gender or "")
+            concentrations.append(record.concentration or "")
+        
+        every = np.arange(self.size, dtype=np.int32)
+        self.notes = group_postings(
+            list(note_codes), np.array(notes, dtype=np.int32),
+            np.array(positions, dtype=np.int32), np.array(tiers, dtype=np.uint8)
+        )
+        groups = []
+        for values in (brands, genders, concentrations):
+            codes: Dict[str, int] = {}
+            encoded = encode(values, codes)
+            groups.append(group_postings(list(codes), encoded, every))
+        self.brands, self.genders, self.concentrations = groups
+        for group in (self.notes, self.brands, self.genders, self.concentrations):
+            for postings in group.values():
+                postings.cache(self.size)
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def _union(self, postings: List[Postings]) -> np.ndarray:
+        result = np.zeros_like(self.universe)
+        for p in postings:
+            result |= p.bitmaps(self.size)[0]
+        return result
+    
+    def filter(self, all_notes: Sequence[str] = (), any_notes: Sequence[str] = (), exclude_notes: Sequence[str] = (),
+               brand: Optional[str] = None, gender: Optional[str] = None,
+               concentration: Optional[str] = None) -> Optional[np.ndarray]:
+        required = [self.notes.get(note) for note in all_notes]
+        if any(p is None for p in required):
+            return None
+        matches = self.universe.copy()
+        for p in sorted(required, key=len):
+            matches &= p.bitmaps(self.size)[0]
+        if any_notes:
+            matches &= self._union([self.notes[note] for note in any_notes if note in self.notes])
+        for note in exclude_notes:
+            if note in self.notes:
+                matches &= ~self.notes[note].bitmaps(self.size)[0]
+        if brand:
+            needle = brand.lower()
+            matches &= self._union([p for label, p in self.brands.items() if needle in label.lower()])
+        for value, group in ((gender, self.genders), (concentration, self.concentrations)):
+            if value:
+                if value not in group:
+                    return None
+                matches &= group[value].bitmaps(self.size)[0]
+        return matches
+    
+    def score_levels(self, matches: np.ndarray, all_notes: Sequence[str] = (),
+                     any_notes: Sequence[str] = ()) -> List[Tuple[int, np.ndarray]]:
+        levels = {0: matches}
+        for note in list(all_notes) + list(any_notes):
+            if note not in self.notes:
+                continue
+            bitmaps = self.notes[note].bitmaps(self.size)
+            scored: Dict[int, np.ndarray] = {}
+            for score, level in levels.items():
+                parts = [(score + points, level & tier) for points, tier in zip(TIER_POINTS, bitmaps[1:])]
+                if note not in all_notes:
+                    parts.append((score, level & ~bitmaps[0]))
+                for key, part in parts:
+                    if part.any():
+                        scored[key] = scored[key] | part if key in scored else part
+            levels = scored
+        return sorted(levels.items(), key=lambda item: -item[0])
+    
+    def search(self, all_notes: Sequence[str] = (), any_notes: Sequence[str] = (), exclude_notes: Sequence[str] = (),
+               brand: Optional[str] = None, gender: Optional[str] = None, concentration: Optional[str] = None,
+               limit: int = 20, offset: int = 0) -> List[str]:
+        matches = self.filter(all_notes, any_notes, exclude_notes, brand, gender, concentration)
+        if matches is None or limit <= 0:
+            return []
+        
+        fragrance_ids = []
+        for _, level in self.score_levels(matches, all_notes, any_notes):
+            if offset:
+                count = popcount(level)
+                if offset >= count:
+                    offset -= count
+                    continue
+            positions = bitmap_positions(level, offset, limit - len(fragrance_ids))
+            fragrance_ids.extend(self.ids[p] for p in positions.tolist())
+            offset = 0
+            if len(fragrance_ids) >= limit:
+                break
+        return fragrance_ids
+    
+    def count(self, matches: Optional[np.ndarray]) -> int:
+        return 0 if matches is None else popcount(matches)
+    
+    def contains(self, matches: Optional[np.ndarray], fragrance_id: str) -> bool:
+        position = self.positions.get(fragrance_id)
+        if matches is None or position is None:
+            return False
+        return bool(int(matches[position >> 6]) >> (position & 63) & 1)
+    
+    def metrics(self) -> dict:
+        return {
+            "version": self.version,
+            "fragrances": self.size,
+            "notes": len(self.notes),
+            "dense_notes": sum(1 for p in self.notes.values() if p.is_dense),
+            "bytes": sum(p.nbytes for group in (self.notes, self.brands, self.genders, self.concentrations)
+                         for p in group.values()),
+        }
+
+
+class NoteIndexCache:
+    def __init__(self):
+        self._index: Optional[NoteIndex] = None
+        self._lock = threading.RLock()
+        self._rebuilding: Optional[threading.Thread] = None
+        self.builds = 0
+        self.last_build_seconds: Optional[float] = None
+    
+    def _build(self, records: Dict[str, FragranceRecord], version: int) -> NoteIndex:
+        start = time.perf_counter()
+        index = NoteIndex(records, version)
+        with self._lock:
+            if self._index is None or version > self._index.version:
+                self._index = index
+            self.builds += 1
+            self.last_build_seconds = time.perf_counter() - start
+        return index
+    
+    def _rebuild(self, records: Dict[str, FragranceRecord], version: int):
+        try:
+            self._build(records, version)
+        except Exception as e:
+            print(f"Warning: Note index rebuild failed: {e}")
+        finally:
+            self._rebuilding = None
+    
+    def current(self, db: Session) -> NoteIndex:
+        version, records = get_catalog().snapshot(db)
+        index = self._index
+        if index is None:
+            with self._lock:
+                index = self._index if self._index is not None else self._build(records, version)
+        if version > index.version:
+            with self._lock:
+                if self._rebuilding is None and version > self._index.version:
+                    self._rebuilding = threading.Thread(
+                        target=self._rebuild, args=(records, version), name="note-index", daemon=True
+                    )
+                    self._rebuilding.start()
+        return index
+    
+    def metrics(self) -> dict:
+        index = self._index
+        metrics = index.metrics() if index is not None else {"version": None, "fragrances": 0}
+        metrics["builds"] = self.builds
+        metrics["rebuilding"] = self._rebuilding is not None
+        metrics["last_build_seconds"] = self.last_build_seconds
+        return metrics
+
+
+note_index = NoteIndexCache()
+
+
+def get_note_index() -> NoteIndexCache:
+    return note_index
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+CACHE_SIZE = int(os.environ.get("SCENT_PREDICTION_CACHE_SIZE", 10000))
+CACHE_TTL_SECONDS = float(os.environ.get("SCENT_PREDICTION_CACHE_TTL_SECONDS", 300))
+CACHE_PRECISION = int(os.environ.get("SCENT_PREDICTION_CACHE_PRECISION", 2))
+
+
+class PredictionCache:
+    def __init__(self, max_entries: int = CACHE_SIZE, ttl_seconds: float = CACHE_TTL_SECONDS,
+                 precision: int = CACHE_PRECISION):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.precision = precision
+        self._entries: "OrderedDict[tuple, Tuple[float, List[Tuple[str, float]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def make_key(self, model_version: int, vector: np.ndarray, top_k: int) -> tuple:
+        quantized = np.rint(vector * (10 ** self.precision)).astype(np.int32)
+        return model_version, top_k, quantized.tobytes()
+    
+    def get(self, key: tuple) -> Optional[List[Tuple[str, float]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, results = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(results)
+    
+    def put(self, key: tuple, results: List[Tuple[str, float]]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+    
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "precision": self.precision,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -3,11 +3,13 @@ from backend.routes.scans import router as scans_router
 from backend.routes.fragrances import router as fragrances_router
 from backend.routes.favorites import router as favorites_router
 from backend.routes.feedback import router as feedback_router
+from backend.routes.sensor import router as sensor_router
 
 __all__ = [
     "auth_router",
     "scans_router",
     "fragrances_router",
     "favorites_router",
-    "feedback_router"
+    "feedback_router",
+    "sensor_router"
 ]
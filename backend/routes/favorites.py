@@ -2,42 +2,32 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from backend.database import get_db
-from backend.models import User, Fragrance, Favorite
-from backend.schemas import FavoriteResponse, FragranceListResponse
+from backend.models import User, Favorite
+from backend.schemas import FavoriteResponse
 from backend.auth import get_current_user
+from backend.catalog import get_catalog
 
 router = APIRouter(prefix="/favorites", tags=["Favorites"])
 
 
-def fragrance_to_list_response(fragrance: Fragrance, is_favorite: bool = True) -> FragranceListResponse:
-    return FragranceListResponse(
-        id=fragrance.id,
-        name=fragrance.name,
-        brand=fragrance.brand,
-        image_url=fragrance.image_url,
-        top_notes=fragrance.top_notes or [],
-        concentration=fragrance.concentration,
-        avg_rating=fragrance.avg_rating or 0.0,
-        is_favorite=is_favorite
-    )
-
-
 @router.get("/", response_model=List[FavoriteResponse])
 async def get_favorites(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    favorites = db.query(Favorite).filter(
+    favorites = db.query(Favorite.id, Favorite.fragrance_id, Favorite.created_at).filter(
         Favorite.user_id == current_user.id
     ).order_by(Favorite.created_at.desc()).all()
     
+    catalog = get_catalog().records(db)
+    
     return [
         FavoriteResponse(
             id=fav.id,
-            fragrance=fragrance_to_list_response(fav.fragrance),
+            fragrance=catalog[fav.fragrance_id].list_item(True),
             created_at=fav.created_at
         )
-        for fav in favorites if fav.fragrance
+        for fav in favorites if fav.fragrance_id in catalog
     ]
 
 
@@ -47,9 +37,9 @@ async def add_favorite(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    fragrance = db.query(Fragrance).filter(Fragrance.id == fragrance_id).first()
+    record = get_catalog().get(db, fragrance_id)
     
-    if not fragrance:
+    if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fragrance not found"
@@ -76,7 +66,7 @@ async def add_favorite(
     
     return FavoriteResponse(
         id=favorite.id,
-        fragrance=fragrance_to_list_response(fragrance),
+        fragrance=record.list_item(True),
         created_at=favorite.created_at
     )
 
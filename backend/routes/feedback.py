@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from backend.database import get_db
-from backend.models import User, Feedback, Scan
+from backend.models import User, Feedback, Scan, TrainingData
 from backend.schemas import FeedbackCreate, FeedbackResponse
 from backend.auth import get_current_user
+from backend.feedback_pipeline import get_feedback_pipeline
+from backend.write_behind import get_write_behind
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
@@ -15,6 +17,8 @@ async def submit_feedback(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    await get_write_behind().settle(current_user.id)
+    
     scan = db.query(Scan).filter(
         Scan.id == feedback_data.scan_id,
         Scan.user_id == current_user.id
@@ -35,8 +39,16 @@ async def submit_feedback(
         existing_feedback.is_correct = feedback_data.is_correct
         existing_feedback.correct_fragrance_name = feedback_data.correct_fragrance_name
         existing_feedback.notes = feedback_data.notes
+        if existing_feedback.processed_at is not None:
+            db.query(TrainingData).filter(
+                TrainingData.feedback_id == existing_feedback.id
+            ).delete(synchronize_session=False)
+            existing_feedback.processed_at = None
         db.commit()
         db.refresh(existing_feedback)
+        
+        get_feedback_pipeline().notify()
+        
         return FeedbackResponse.model_validate(existing_feedback)
     
     feedback = Feedback(
@@ -52,6 +64,8 @@ async def submit_feedback(
     db.commit()
     db.refresh(feedback)
     
+    get_feedback_pipeline().notify()
+    
     return FeedbackResponse.model_validate(feedback)
 
 
@@ -1,51 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from itertools import islice
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from typing import List, Optional
+from sqlalchemy import func
+from typing import List, Optional, Set
 from backend.database import get_db
 from backend.models import User, Fragrance, Favorite
-from backend.schemas import FragranceResponse, FragranceListResponse
+from backend.schemas import FragranceResponse, FragranceListResponse, AutocompleteResponse
 from backend.auth import get_current_user, get_optional_user
+from backend.catalog import get_catalog
+from backend.search import get_full_text_search
+from backend.note_index import get_note_index, parse_notes
+from backend.autocomplete import get_autocomplete
+from backend.model_registry import get_model
+from backend.list_cache import BROWSE_DEPTH, brand_list, browse_list, get_list_cache, popular_list
 
 router = APIRouter(prefix="/fragrances", tags=["Fragrances"])
 
 
-def fragrance_to_response(fragrance: Fragrance, is_favorite: bool = False) -> FragranceResponse:
-    return FragranceResponse(
-        id=fragrance.id,
-        name=fragrance.name,
-        brand=fragrance.brand,
-        description=fragrance.description,
-        image_url=fragrance.image_url,
-        top_notes=fragrance.top_notes or [],
-        mid_notes=fragrance.mid_notes or [],
-        base_notes=fragrance.base_notes or [],
-        concentration=fragrance.concentration,
-        gender=fragrance.gender,
-        year_released=fragrance.year_released,
-        longevity_hours=fragrance.longevity_hours,
-        projection=fragrance.projection,
-        price_min=fragrance.price_min,
-        price_max=fragrance.price_max,
-        price_url=fragrance.price_url,
-        avg_rating=fragrance.avg_rating or 0.0,
-        review_count=fragrance.review_count or 0,
-        created_at=fragrance.created_at,
-        is_favorite=is_favorite
-    )
-
-
-def fragrance_to_list_response(fragrance: Fragrance, is_favorite: bool = False) -> FragranceListResponse:
-    return FragranceListResponse(
-        id=fragrance.id,
-        name=fragrance.name,
-        brand=fragrance.brand,
-        image_url=fragrance.image_url,
-        top_notes=fragrance.top_notes or [],
-        concentration=fragrance.concentration,
-        avg_rating=fragrance.avg_rating or 0.0,
-        is_favorite=is_favorite
-    )
+def favorite_ids(db: Session, current_user: Optional[User]) -> Set[str]:
+    if not current_user:
+        return set()
+    return {row.fragrance_id for row in db.query(Favorite.fragrance_id).filter(Favorite.user_id == current_user.id)}
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def list_items(db: Session, fragrance_ids: List[str], current_user: Optional[User]) -> List[FragranceListResponse]:
+    user_favorite_ids = favorite_ids(db, current_user)
+    
+    return [
+        record.list_item(record.id in user_favorite_ids)
+        for record in get_catalog().get_many(db, fragrance_ids)
+    ]
 
 
 @router.get("/", response_model=List[FragranceListResponse])
@@ -54,22 +42,38 @@ async def list_fragrances(
     brand: Optional[str] = None,
     gender: Optional[str] = None,
     concentration: Optional[str] = None,
+    notes: Optional[List[str]] = Query(default=None),
+    any_notes: Optional[List[str]] = Query(default=None),
+    exclude_notes: Optional[List[str]] = Query(default=None),
     limit: int = Query(default=20, le=100),
     offset: int = 0,
     current_user: Optional[User] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
-    query = db.query(Fragrance)
+    all_notes = parse_notes(notes)
+    some_notes = parse_notes(any_notes)
+    excluded_notes = parse_notes(exclude_notes)
+    note_filter = all_notes or some_notes or excluded_notes
+    
+    if not (q or brand or gender or concentration or note_filter) and 0 <= offset and offset + limit <= BROWSE_DEPTH:
+        cached = get_list_cache().get(
+            db, ("browse", limit, offset), lambda records: browse_list(records, limit, offset)
+        )
+        return json_response(cached.render(favorite_ids(db, current_user)))
+    
+    if note_filter and not q:
+        index = get_note_index().current(db)
+        fragrance_ids = index.search(
+            all_notes, some_notes, excluded_notes,
+            brand=brand, gender=gender, concentration=concentration,
+            limit=limit, offset=offset
+        )
+        return list_items(db, fragrance_ids, current_user)
+    
+    query = db.query(Fragrance.id)
     
     if q:
-        search_term = f"%{q}%"
-        query = query.filter(
-            or_(
-                Fragrance.name.ilike(search_term),
-                Fragrance.brand.ilike(search_term),
-                Fragrance.description.ilike(search_term)
-            )
-        )
+        query = get_full_text_search().apply(query, q)
     
     if brand:
         query = query.filter(Fragrance.brand.ilike(f"%{brand}%"))
@@ -80,23 +84,22 @@ async def list_fragrances(
     if concentration:
         query = query.filter(Fragrance.concentration == concentration)
     
-    fragrances = query.order_by(Fragrance.avg_rating.desc()).offset(offset).limit(limit).all()
+    query = query.order_by(Fragrance.avg_rating.desc(), Fragrance.id)
     
-    user_favorite_ids = set()
-    if current_user:
-        for fav in current_user.favorites:
-            user_favorite_ids.add(fav.fragrance_id)
+    if note_filter:
+        index = get_note_index().current(db)
+        note_matches = index.filter(all_notes, some_notes, excluded_notes)
+        matches = (row.id for row in query.yield_per(500) if index.contains(note_matches, row.id))
+        fragrance_ids = list(islice(matches, offset, offset + limit))
+    else:
+        fragrance_ids = [row.id for row in query.offset(offset).limit(limit).all()]
     
-    return [
-        fragrance_to_list_response(f, f.id in user_favorite_ids)
-        for f in fragrances
-    ]
+    return list_items(db, fragrance_ids, current_user)
 
 
 @router.get("/brands", response_model=List[str])
 async def list_brands(db: Session = Depends(get_db)):
-    brands = db.query(Fragrance.brand).distinct().order_by(Fragrance.brand).all()
-    return [b[0] for b in brands if b[0]]
+    return json_response(get_list_cache().get(db, ("brands",), brand_list).render())
 
 
 @router.get("/popular", response_model=List[FragranceListResponse])
@@ -105,20 +108,17 @@ async def get_popular_fragrances(
     current_user: Optional[User] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
-    fragrances = db.query(Fragrance).order_by(
-        Fragrance.avg_rating.desc(),
-        Fragrance.review_count.desc()
-    ).limit(limit).all()
-    
-    user_favorite_ids = set()
-    if current_user:
-        for fav in current_user.favorites:
-            user_favorite_ids.add(fav.fragrance_id)
-    
-    return [
-        fragrance_to_list_response(f, f.id in user_favorite_ids)
-        for f in fragrances
-    ]
+    cached = get_list_cache().get(db, ("popular", limit), lambda records: popular_list(records, limit))
+    return json_response(cached.render(favorite_ids(db, current_user)))
+
+
+@router.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete_fragrances(
+    q: str = "",
+    limit: int = Query(default=8, ge=1, le=20),
+    db: Session = Depends(get_db)
+):
+    return get_autocomplete().current(db).suggest(q, limit)
 
 
 @router.get("/{fragrance_id}", response_model=FragranceResponse)
@@ -127,9 +127,9 @@ async def get_fragrance(
     current_user: Optional[User] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
-    fragrance = db.query(Fragrance).filter(Fragrance.id == fragrance_id).first()
+    record = get_catalog().get(db, fragrance_id)
     
-    if not fragrance:
+    if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fragrance not found"
@@ -143,38 +143,38 @@ async def get_fragrance(
         ).first()
         is_favorite = favorite is not None
     
-    return fragrance_to_response(fragrance, is_favorite)
+    return record.detail(is_favorite)
 
 
 @router.get("/{fragrance_id}/similar", response_model=List[FragranceListResponse])
 async def get_similar_fragrances(
     fragrance_id: str,
     limit: int = Query(default=5, le=20),
+    brand: Optional[str] = None,
+    gender: Optional[str] = None,
     current_user: Optional[User] = Depends(get_optional_user),
     db: Session = Depends(get_db)
 ):
-    fragrance = db.query(Fragrance).filter(Fragrance.id == fragrance_id).first()
+    record = get_catalog().get(db, fragrance_id)
     
-    if not fragrance:
+    if not record:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Fragrance not found"
         )
     
-    similar = db.query(Fragrance).filter(
-        Fragrance.id != fragrance_id,
-        or_(
-            Fragrance.brand == fragrance.brand,
-            Fragrance.gender == fragrance.gender
-        )
-    ).order_by(Fragrance.avg_rating.desc()).limit(limit).all()
-    
-    user_favorite_ids = set()
-    if current_user:
-        for fav in current_user.favorites:
-            user_favorite_ids.add(fav.fragrance_id)
-    
-    return [
-        fragrance_to_list_response(f, f.id in user_favorite_ids)
-        for f in similar
-    ]
+    records = get_catalog().records(db)
+    similar_ids = []
+    for neighbour_id, _ in get_model().similar(fragrance_id):
+        neighbour = records.get(neighbour_id)
+        if neighbour is None:
+            continue
+        if brand and brand.lower() not in (neighbour.brand or "").lower():
+            continue
+        if gender and neighbour.gender != gender:
+            continue
+        similar_ids.append(neighbour_id)
+        if len(similar_ids) == limit:
+            break
+    
+    return list_items(db, similar_ids, current_user)
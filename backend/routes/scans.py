@@ -1,140 +1,362 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import base64
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from backend.database import get_db
-from backend.models import User, Scan, Fragrance, SensorData
-from backend.schemas import ScanRequest, ScanResponse, ScanMatch, ScanHistoryItem, FragranceResponse, FragranceListResponse
-from backend.auth import get_current_user, get_optional_user
-from backend.ml_model import get_model
+from typing import Callable, List, Optional
+from datetime import datetime
+from backend.database import SessionLocal, get_db
+from backend.models import User, Scan, SensorData, generate_uuid
+from backend.schemas import ScanRequest, ScanResponse, ScanMatch, ScanHistoryItem, BatchScanRequest, BatchScanResponse, ScanFrame
+from backend.auth import get_current_user, get_optional_user, get_user_from_token
+from backend.ml_model import ScentRecognitionModel
+from backend.model_registry import get_model, get_registry
+from backend.catalog import get_catalog
+from backend.calibration import get_calibration_table
+from backend.write_behind import get_write_behind
+from backend.scan_session import ScanSession
+from backend.idempotency import IdempotencyConflict, fingerprint, get_idempotency_store
 
 router = APIRouter(prefix="/scans", tags=["Scans"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
 
-def fragrance_to_response(fragrance: Fragrance, is_favorite: bool = False) -> FragranceResponse:
-    return FragranceResponse(
-        id=fragrance.id,
-        name=fragrance.name,
-        brand=fragrance.brand,
-        description=fragrance.description,
-        image_url=fragrance.image_url,
-        top_notes=fragrance.top_notes or [],
-        mid_notes=fragrance.mid_notes or [],
-        base_notes=fragrance.base_notes or [],
-        concentration=fragrance.concentration,
-        gender=fragrance.gender,
-        year_released=fragrance.year_released,
-        longevity_hours=fragrance.longevity_hours,
-        projection=fragrance.projection,
-        price_min=fragrance.price_min,
-        price_max=fragrance.price_max,
-        price_url=fragrance.price_url,
-        avg_rating=fragrance.avg_rating or 0.0,
-        review_count=fragrance.review_count or 0,
-        created_at=fragrance.created_at,
-        is_favorite=is_favorite
-    )
+
+def encode_cursor(scanned_at: datetime, scan_id: str) -> str:
+    raw = f"{scanned_at.isoformat()}|{scan_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        scanned_at, scan_id = raw.split("|", 1)
+        return datetime.fromisoformat(scanned_at), scan_id
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def record_scans(db: Session, current_user: User, scans: List[ScanRequest], model: ScentRecognitionModel,
+                 predictions_batch) -> List[ScanResponse]:
+    scanned_at = datetime.utcnow()
+    rows = []
+    responses = []
+    
+    user_favorite_ids = set()
+    for fav in current_user.favorites:
+        user_favorite_ids.add(fav.fragrance_id)
+    
+    catalog = get_catalog().records(db)
+    
+    for scan_data, predictions in zip(scans, predictions_batch):
+        if scan_data.device_id:
+            rows.append((SensorData, dict(
+                device_id=scan_data.device_id,
+                raw_readings=scan_data.voc_vector,
+                processed_vector=scan_data.voc_vector,
+                temperature=scan_data.temperature,
+                humidity=scan_data.humidity,
+                timestamp=scanned_at
+            )))
+        
+        best_match = None
+        alternatives = []
+        best_fragrance_id = None
+        best_confidence = 0.0
+        
+        for i, (fragrance_id, confidence) in enumerate(predictions):
+            record = catalog.get(fragrance_id)
+            if record:
+                is_favorite = record.id in user_favorite_ids
+                match = ScanMatch(
+                    fragrance=record.detail(is_favorite),
+                    confidence_score=confidence
+                )
+                if i == 0:
+                    best_match = match
+                    best_fragrance_id = fragrance_id
+                    best_confidence = confidence
+                else:
+                    alternatives.append(match)
+        
+        scan_id = generate_uuid()
+        rows.append((Scan, dict(
+            id=scan_id,
+            user_id=current_user.id,
+            fragrance_id=best_fragrance_id,
+            raw_voc_vector=scan_data.voc_vector,
+            confidence_score=best_confidence,
+            alternative_matches=[{"id": f_id, "confidence": conf} for f_id, conf in predictions[1:]],
+            model_version=model.version if model.is_fitted else None,
+            scanned_at=scanned_at
+        )))
+        responses.append(ScanResponse(
+            id=scan_id,
+            best_match=best_match,
+            alternatives=alternatives,
+            scanned_at=scanned_at
+        ))
+    
+    get_write_behind().persist(db, current_user.id, rows)
+    
+    return responses
+
+
+def record_scan(db: Session, current_user: User, scan_data: ScanRequest, model: ScentRecognitionModel,
+                predictions) -> ScanResponse:
+    return record_scans(db, current_user, [scan_data], model, [predictions])[0]
 
 
-def fragrance_to_list_response(fragrance: Fragrance, is_favorite: bool = False) -> FragranceListResponse:
-    return FragranceListResponse(
-        id=fragrance.id,
-        name=fragrance.name,
-        brand=fragrance.brand,
-        image_url=fragrance.image_url,
-        top_notes=fragrance.top_notes or [],
-        concentration=fragrance.concentration,
-        avg_rating=fragrance.avg_rating or 0.0,
-        is_favorite=is_favorite
+def submit_scan(db: Session, current_user: User, scan_data: ScanRequest) -> ScanResponse:
+    get_calibration_table().sync(db)
+    model = get_model()
+    
+    if not model.is_fitted:
+        get_registry().request_refresh()
+    
+    predictions = model.predict(
+        scan_data.voc_vector,
+        top_k=5,
+        device_id=scan_data.device_id,
+        temperature=scan_data.temperature,
+        humidity=scan_data.humidity
     )
+    
+    return record_scan(db, current_user, scan_data, model, predictions)
+
+
+def idempotent_job(user_id: str, submit: Callable[[Session, User], BaseModel]) -> bytes:
+    db = SessionLocal()
+    try:
+        current_user = db.query(User).filter(User.id == user_id).first()
+        return submit(db, current_user).model_dump_json().encode()
+    finally:
+        db.close()
+
+
+async def run_idempotent(db: Session, user_id: str, key: tuple, payload: str,
+                         submit: Callable[[Session, User], BaseModel]) -> Response:
+    db.commit()
+    
+    try:
+        body, replayed = await get_idempotency_store().run(
+            key, fingerprint(payload), lambda: run_in_threadpool(idempotent_job, user_id, submit)
+        )
+    except IdempotencyConflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    
+    response = Response(content=body, media_type="application/json")
+    if replayed:
+        response.headers[IDEMPOTENT_REPLAYED_HEADER] = "true"
+    return response
 
 
 @router.post("/", response_model=ScanResponse)
 async def create_scan(
     scan_data: ScanRequest,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    if idempotency_key is None:
+        return await run_in_threadpool(submit_scan, db, current_user, scan_data)
+    
+    return await run_idempotent(
+        db,
+        current_user.id,
+        (current_user.id, "scan", idempotency_key),
+        scan_data.model_dump_json(),
+        lambda db, user: submit_scan(db, user, scan_data)
+    )
+
+
+def submit_scan_batch(db: Session, current_user: User, batch_data: BatchScanRequest) -> BatchScanResponse:
+    get_calibration_table().sync(db)
     model = get_model()
     
     if not model.is_fitted:
-        model.fit(db)
-    
-    if scan_data.device_id:
-        sensor_record = SensorData(
-            device_id=scan_data.device_id,
-            raw_readings=scan_data.voc_vector,
-            processed_vector=scan_data.voc_vector,
-            temperature=scan_data.temperature,
-            humidity=scan_data.humidity
-        )
-        db.add(sensor_record)
-    
-    predictions = model.predict(scan_data.voc_vector, top_k=5)
+        get_registry().request_refresh()
     
-    best_match = None
-    alternatives = []
-    best_fragrance_id = None
-    best_confidence = 0.0
+    predictions_batch = model.predict_batch(
+        [scan_data.voc_vector for scan_data in batch_data.scans],
+        top_k=5,
+        device_ids=[scan_data.device_id for scan_data in batch_data.scans],
+        temperatures=[scan_data.temperature for scan_data in batch_data.scans],
+        humidities=[scan_data.humidity for scan_data in batch_data.scans]
+    )
     
-    user_favorite_ids = set()
-    for fav in current_user.favorites:
-        user_favorite_ids.add(fav.fragrance_id)
+    return BatchScanResponse(scans=record_scans(db, current_user, batch_data.scans, model, predictions_batch))
+
+
+@router.post("/batch", response_model=BatchScanResponse)
+async def create_scan_batch(
+    batch_data: BatchScanRequest,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    if idempotency_key is None:
+        return await run_in_threadpool(submit_scan_batch, db, current_user, batch_data)
     
-    for i, (fragrance_id, confidence) in enumerate(predictions):
-        fragrance = db.query(Fragrance).filter(Fragrance.id == fragrance_id).first()
-        if fragrance:
-            is_favorite = fragrance.id in user_favorite_ids
-            match = ScanMatch(
-                fragrance=fragrance_to_response(fragrance, is_favorite),
-                confidence_score=confidence
-            )
-            if i == 0:
-                best_match = match
-                best_fragrance_id = fragrance_id
-                best_confidence = confidence
-            else:
-                alternatives.append(match)
-    
-    scan = Scan(
-        user_id=current_user.id,
-        fragrance_id=best_fragrance_id,
-        raw_voc_vector=scan_data.voc_vector,
-        confidence_score=best_confidence,
-        alternative_matches=[{"id": f_id, "confidence": conf} for f_id, conf in predictions[1:]]
+    return await run_idempotent(
+        db,
+        current_user.id,
+        (current_user.id, "scan-batch", idempotency_key),
+        batch_data.model_dump_json(),
+        lambda db, user: submit_scan_batch(db, user, batch_data)
     )
-    db.add(scan)
-    db.commit()
-    db.refresh(scan)
+
+
+@router.websocket("/stream")
+async def stream_scan(
+    websocket: WebSocket,
+    token: str,
+    device_id: Optional[str] = None
+):
+    db = SessionLocal()
+    try:
+        current_user = get_user_from_token(token, db)
+        user_id = current_user.id if current_user is not None else None
+        catalog = get_catalog().records(db)
+        get_calibration_table().sync(db)
+    finally:
+        db.close()
     
-    return ScanResponse(
-        id=scan.id,
-        best_match=best_match,
-        alternatives=alternatives,
-        scanned_at=scan.scanned_at
-    )
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    
+    model = get_model()
+    if not model.is_fitted:
+        get_registry().request_refresh()
+    
+    session = ScanSession(vector_size=model.vector_size)
+    
+    try:
+        while not session.is_finished:
+            try:
+                message = await websocket.receive_json()
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Frame is not valid JSON"})
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_json({"type": "error", "detail": "Frame must be a JSON object"})
+                continue
+            if message.get("action") == "finalize":
+                break
+            
+            try:
+                frame = ScanFrame.model_validate(message)
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "detail": e.errors(include_url=False)})
+                continue
+            
+            session.add_frame(frame.voc_vector, frame.temperature, frame.humidity)
+            session.update(model.predict(
+                session.aggregate(),
+                top_k=5,
+                device_id=device_id,
+                temperature=session.temperature,
+                humidity=session.humidity
+            ))
+            
+            await websocket.send_json({
+                "type": "provisional",
+                "frames": session.frames,
+                "stable_frames": session.stable_count,
+                "matches": [
+                    {
+                        "fragrance_id": fragrance_id,
+                        "name": catalog[fragrance_id].name if fragrance_id in catalog else None,
+                        "brand": catalog[fragrance_id].brand if fragrance_id in catalog else None,
+                        "confidence_score": confidence
+                    }
+                    for fragrance_id, confidence in session.predictions
+                ]
+            })
+        
+        if session.frames == 0:
+            await websocket.close()
+            return
+        
+        scan_data = ScanRequest(
+            voc_vector=session.aggregate(),
+            device_id=device_id,
+            temperature=session.temperature,
+            humidity=session.humidity
+        )
+        db = SessionLocal()
+        try:
+            current_user = db.query(User).filter(User.id == user_id).first()
+            if current_user is None:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                return
+            scan = record_scan(db, current_user, scan_data, model, session.predictions)
+        finally:
+            db.close()
+        
+        await websocket.send_json({
+            "type": "result",
+            "frames": session.frames,
+            "early": session.is_stable,
+            "scan": scan.model_dump(mode="json")
+        })
+        await websocket.close()
+    except WebSocketDisconnect:
+        return
 
 
 @router.get("/history", response_model=List[ScanHistoryItem])
 async def get_scan_history(
+    response: Response,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    scans = db.query(Scan).filter(
+    await get_write_behind().settle(current_user.id)
+    
+    query = db.query(Scan.id, Scan.fragrance_id, Scan.confidence_score, Scan.scanned_at).filter(
         Scan.user_id == current_user.id
-    ).order_by(Scan.scanned_at.desc()).offset(offset).limit(limit).all()
+    )
+    
+    if cursor:
+        query = query.filter(tuple_(Scan.scanned_at, Scan.id) < decode_cursor(cursor))
+    
+    query = query.order_by(Scan.scanned_at.desc(), Scan.id.desc())
+    
+    if offset and not cursor:
+        query = query.offset(offset)
+    
+    scans = query.limit(limit).all()
+    
+    if scans and len(scans) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(scans[-1].scanned_at, scans[-1].id)
     
     user_favorite_ids = set()
     for fav in current_user.favorites:
         user_favorite_ids.add(fav.fragrance_id)
     
+    catalog = get_catalog().records(db)
+    
     results = []
     for scan in scans:
         fragrance_response = None
-        if scan.fragrance:
-            is_favorite = scan.fragrance.id in user_favorite_ids
-            fragrance_response = fragrance_to_list_response(scan.fragrance, is_favorite)
+        record = catalog.get(scan.fragrance_id)
+        if record:
+            is_favorite = record.id in user_favorite_ids
+            fragrance_response = record.list_item(is_favorite)
         
         results.append(ScanHistoryItem(
             id=scan.id,
@@ -152,6 +374,8 @@ async def get_scan(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    await get_write_behind().settle(current_user.id)
+    
     scan = db.query(Scan).filter(
         Scan.id == scan_id,
         Scan.user_id == current_user.id
@@ -167,22 +391,26 @@ async def get_scan(
     for fav in current_user.favorites:
         user_favorite_ids.add(fav.fragrance_id)
     
+    alternative_matches = scan.alternative_matches or []
+    catalog = get_catalog().records(db)
+    
     best_match = None
-    if scan.fragrance:
-        is_favorite = scan.fragrance.id in user_favorite_ids
+    record = catalog.get(scan.fragrance_id)
+    if record:
+        is_favorite = record.id in user_favorite_ids
         best_match = ScanMatch(
-            fragrance=fragrance_to_response(scan.fragrance, is_favorite),
+            fragrance=record.detail(is_favorite),
             confidence_score=scan.confidence_score
         )
     
     alternatives = []
-    if scan.alternative_matches:
-        for alt in scan.alternative_matches:
-            fragrance = db.query(Fragrance).filter(Fragrance.id == alt["id"]).first()
-            if fragrance:
-                is_favorite = fragrance.id in user_favorite_ids
+    if alternative_matches:
+        for alt in alternative_matches:
+            record = catalog.get(alt["id"])
+            if record:
+                is_favorite = record.id in user_favorite_ids
                 alternatives.append(ScanMatch(
-                    fragrance=fragrance_to_response(fragrance, is_favorite),
+                    fragrance=record.detail(is_favorite),
                     confidence_score=alt["confidence"]
                 ))
     
@@ -200,6 +428,8 @@ async def delete_scan(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    await get_write_behind().settle(current_user.id)
+    
     scan = db.query(Scan).filter(
         Scan.id == scan_id,
         Scan.user_id == current_user.id
@@ -0,0 +1,101 @@
+import os
+import secrets
+import time
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Optional
+from backend.database import get_db
+from backend.models import DeviceCalibration
+from backend.schemas import CalibrationProfileUpdate, CalibrationProfileResponse
+from backend.calibration import get_calibration_table
+from backend.sensor_ingest import IngestError, ingest, parse_binary, parse_ndjson
+
+router = APIRouter(prefix="/sensor", tags=["Sensor"])
+
+INGEST_KEY = os.environ.get("SCENT_INGEST_KEY")
+BINARY_CONTENT_TYPES = ("application/octet-stream", "application/x-scent-frames")
+
+
+def require_ingest_key(x_ingest_key: Optional[str] = Header(default=None)):
+    if not INGEST_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Sensor writes are disabled until SCENT_INGEST_KEY is configured"
+        )
+    if x_ingest_key is None or not secrets.compare_digest(x_ingest_key, INGEST_KEY):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid ingest key"
+        )
+
+
+def ingest_body(db: Session, body: bytes, content_type: str) -> dict:
+    start = time.perf_counter()
+    if content_type in BINARY_CONTENT_TYPES:
+        batch = parse_binary(body)
+    else:
+        batch = parse_ndjson(body)
+    report = ingest(db, batch)
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+@router.post("/ingest")
+async def ingest_frames(
+    request: Request,
+    _: None = Depends(require_ingest_key),
+    db: Session = Depends(get_db)
+):
+    content_type = request.headers.get("content-type", "application/x-ndjson").split(";")[0].strip()
+    body = await request.body()
+    
+    try:
+        return await run_in_threadpool(ingest_body, db, body, content_type)
+    except IngestError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get("/calibration/{device_id}", response_model=CalibrationProfileResponse)
+async def get_calibration(
+    device_id: str,
+    db: Session = Depends(get_db)
+):
+    profile = db.query(DeviceCalibration).filter(DeviceCalibration.device_id == device_id).first()
+    
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calibration profile not found"
+        )
+    
+    return CalibrationProfileResponse.model_validate(profile)
+
+
+@router.put("/calibration/{device_id}", response_model=CalibrationProfileResponse)
+async def put_calibration(
+    device_id: str,
+    profile_data: CalibrationProfileUpdate,
+    _: None = Depends(require_ingest_key),
+    db: Session = Depends(get_db)
+):
+    profile = db.query(DeviceCalibration).filter(DeviceCalibration.device_id == device_id).first()
+    if not profile:
+        profile = DeviceCalibration(device_id=device_id)
+        db.add(profile)
+    
+    profile.baseline = profile_data.baseline
+    profile.gain = profile_data.gain
+    profile.temperature_coeff = profile_data.temperature_coeff
+    profile.humidity_coeff = profile_data.humidity_coeff
+    profile.reference_temperature = profile_data.reference_temperature
+    profile.reference_humidity = profile_data.reference_humidity
+    db.commit()
+    db.refresh(profile)
+    
+    get_calibration_table().load(db)
+    
+    return CalibrationProfileResponse.model_validate(profile)
@@ -0,0 +1,71 @@
+import os
+from typing import List, Optional, Tuple
+import numpy as np
+
+WINDOW_SIZE = int(os.environ.get("SCENT_STREAM_WINDOW", 8))
+MIN_FRAMES = int(os.environ.get("SCENT_STREAM_MIN_FRAMES", 3))
+MAX_FRAMES = int(os.environ.get("SCENT_STREAM_MAX_FRAMES", 120))
+CONFIDENCE_THRESHOLD = float(os.environ.get("SCENT_STREAM_CONFIDENCE", 0.8))
+STABLE_FRAMES = int(os.environ.get("SCENT_STREAM_STABLE_FRAMES", 3))
+
+
+class ScanSession:
+    def __init__(self, vector_size: int = 16, window_size: int = WINDOW_SIZE, min_frames: int = MIN_FRAMES,
+                 max_frames: int = MAX_FRAMES, confidence_threshold: float = CONFIDENCE_THRESHOLD,
+                 stable_frames: int = STABLE_FRAMES):
+        self.vector_size = vector_size
+        self.window_size = window_size
+        self.min_frames = min_frames
+        self.max_frames = max_frames
+        self.confidence_threshold = confidence_threshold
+        self.stable_frames = stable_frames
+        self._window = np.zeros((window_size, vector_size), dtype=np.float64)
+        self._sum = np.zeros(vector_size, dtype=np.float64)
+        self._temperatures: List[float] = []
+        self._humidities: List[float] = []
+        self.frames = 0
+        self.stable_count = 0
+        self.predictions: List[Tuple[str, float]] = []
+    
+    def add_frame(self, voc_vector: List[float], temperature: Optional[float] = None,
+                  humidity: Optional[float] = None):
+        frame = np.zeros(self.vector_size, dtype=np.float64)
+        values = np.asarray(voc_vector, dtype=np.float64)[:self.vector_size]
+        frame[:len(values)] = values
+        
+        slot = self.frames % self.window_size
+        self._sum += frame - self._window[slot]
+        self._window[slot] = frame
+        self.frames += 1
+        
+        if temperature is not None:
+            self._temperatures.append(temperature)
+        if humidity is not None:
+            self._humidities.append(humidity)
+    
+    def aggregate(self) -> List[float]:
+        return (self._sum / min(self.frames, self.window_size)).tolist()
+    
+    def update(self, predictions: List[Tuple[str, float]]):
+        previous = self.predictions[0][0] if self.predictions else None
+        self.predictions = predictions
+        if predictions and predictions[0][1] >= self.confidence_threshold:
+            self.stable_count = self.stable_count + 1 if predictions[0][0] == previous else 1
+        else:
+            self.stable_count = 0
+    
+    @property
+    def is_stable(self) -> bool:
+        return self.frames >= self.min_frames and self.stable_count >= self.stable_frames
+    
+    @property
+    def is_finished(self) -> bool:
+        return self.is_stable or self.frames >= self.max_frames
+    
+    @property
+    def temperature(self) -> Optional[float]:
+        return float(np.mean(self._temperatures)) if self._temperatures else None
+    
+    @property
+    def humidity(self) -> Optional[float]:
+        return float(np.mean(self._humidities)) if self._humidities else None
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 
+MAX_BATCH_SIZE = 10000
+
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -80,6 +82,12 @@ class ScanRequest(BaseModel):
     humidity: Optional[float] = None
 
 
+class ScanFrame(BaseModel):
+    voc_vector: List[float]
+    temperature: Optional[float] = None
+    humidity: Optional[float] = None
+
+
 class ScanMatch(BaseModel):
     fragrance: FragranceResponse
     confidence_score: float
@@ -95,6 +103,14 @@ class ScanResponse(BaseModel):
         from_attributes = True
 
 
+class BatchScanRequest(BaseModel):
+    scans: List[ScanRequest] = Field(max_length=MAX_BATCH_SIZE)
+
+
+class BatchScanResponse(BaseModel):
+    scans: List[ScanResponse]
+
+
 class ScanHistoryItem(BaseModel):
     id: str
     fragrance: Optional[FragranceListResponse]
@@ -133,6 +149,45 @@ class FeedbackResponse(BaseModel):
         from_attributes = True
 
 
+class CalibrationProfileUpdate(BaseModel):
+    baseline: List[float] = []
+    gain: List[float] = []
+    temperature_coeff: List[float] = []
+    humidity_coeff: List[float] = []
+    reference_temperature: float = 25.0
+    reference_humidity: float = 50.0
+
+
+class CalibrationProfileResponse(BaseModel):
+    device_id: str
+    baseline: Optional[List[float]]
+    gain: Optional[List[float]]
+    temperature_coeff: Optional[List[float]]
+    humidity_coeff: Optional[List[float]]
+    reference_temperature: float
+    reference_humidity: float
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class AutocompleteSuggestion(BaseModel):
+    type: str
+    text: str
+    fragrance_id: Optional[str] = None
+    brand: Optional[str] = None
+    avg_rating: float = 0.0
+    review_count: int = 0
+
+
+class AutocompleteResponse(BaseModel):
+    query: str
+    fragrances: List[AutocompleteSuggestion] = []
+    brands: List[AutocompleteSuggestion] = []
+    notes: List[AutocompleteSuggestion] = []
+
+
 class PaginatedResponse(BaseModel):
     items: List
     total: int
@@ -0,0 +1,120 @@
+import re
+from typing import Optional
+from sqlalchemy import func, inspect, literal_column, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import column, table
+from backend.models import Fragrance
+
+FTS_TABLE = "fragrance_fts"
+FTS_ID_TABLE = "fragrance_fts_ids"
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+FTS_ROWID = f"(SELECT id FROM {FTS_ID_TABLE} WHERE fragrance_id = new.id)"
+
+SQLITE_RESET = [
+    "DROP TRIGGER IF EXISTS fragrances_fts_insert",
+    "DROP TRIGGER IF EXISTS fragrances_fts_delete",
+    "DROP TRIGGER IF EXISTS fragrances_fts_update",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+    f"DROP TABLE IF EXISTS {FTS_ID_TABLE}",
+]
+
+SQLITE_DDL = [
+    f"CREATE TABLE IF NOT EXISTS {FTS_ID_TABLE} ("
+    "id INTEGER PRIMARY KEY, fragrance_id VARCHAR(36) NOT NULL UNIQUE)",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, brand, description, fragrance_id UNINDEXED, "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS fragrances_fts_insert AFTER INSERT ON fragrances BEGIN "
+    f"INSERT INTO {FTS_ID_TABLE}(fragrance_id) VALUES (new.id); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name, brand, description, fragrance_id) "
+    f"VALUES ({FTS_ROWID}, new.name, new.brand, new.description, new.id); END",
+    f"CREATE TRIGGER IF NOT EXISTS fragrances_fts_delete AFTER DELETE ON fragrances BEGIN "
+    f"DELETE FROM {FTS_TABLE} WHERE rowid = (SELECT id FROM {FTS_ID_TABLE} WHERE fragrance_id = old.id); "
+    f"DELETE FROM {FTS_ID_TABLE} WHERE fragrance_id = old.id; END",
+    f"CREATE TRIGGER IF NOT EXISTS fragrances_fts_update AFTER UPDATE OF id, name, brand, description ON fragrances BEGIN "
+    f"UPDATE {FTS_ID_TABLE} SET fragrance_id = new.id WHERE fragrance_id = old.id; "
+    f"UPDATE {FTS_TABLE} SET name = new.name, brand = new.brand, description = new.description, "
+    f"fragrance_id = new.id WHERE rowid = {FTS_ROWID}; END",
+]
+
+SQLITE_REBUILD = [
+    f"INSERT INTO {FTS_ID_TABLE}(fragrance_id) SELECT id FROM fragrances",
+    f"INSERT INTO {FTS_TABLE}(rowid, name, brand, description, fragrance_id) "
+    f"SELECT ids.id, f.name, f.brand, f.description, f.id FROM fragrances f "
+    f"JOIN {FTS_ID_TABLE} ids ON ids.fragrance_id = f.id",
+]
+
+POSTGRES_DDL = [
+    "ALTER TABLE fragrances ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_fragrances_search_vector ON fragrances USING GIN (search_vector)",
+]
+
+fts = table(FTS_TABLE, column("fragrance_id"))
+
+
+def search_tokens(q: str) -> list:
+    return TOKEN_PATTERN.findall(q.lower())
+
+
+class FullTextSearch:
+    def __init__(self):
+        self.backend: Optional[str] = None
+    
+    def ensure(self, engine: Engine):
+        dialect = engine.dialect.name
+        try:
+            if dialect == "sqlite":
+                created = not inspect(engine).has_table(FTS_ID_TABLE)
+                statements = SQLITE_RESET + SQLITE_DDL + SQLITE_REBUILD if created else SQLITE_DDL
+                with engine.begin() as conn:
+                    for statement in statements:
+                        conn.execute(text(statement))
+                self.backend = "fts5"
+            elif dialect == "postgresql":
+                with engine.begin() as conn:
+                    for statement in POSTGRES_DDL:
+                        conn.execute(text(statement))
+                self.backend = "tsvector"
+        except Exception as e:
+            print(f"Warning: Full-text search unavailable, falling back to ilike: {e}")
+            self.backend = None
+    
+    def apply(self, query: Query, q: str) -> Query:
+        tokens = search_tokens(q)
+        
+        if self.backend == "fts5" and tokens:
+            match = " ".join(f'"{token}"*' for token in tokens)
+            return query.join(fts, fts.c.fragrance_id == Fragrance.id).filter(
+                literal_column(FTS_TABLE).op("MATCH")(match)
+            ).order_by(func.bm25(literal_column(FTS_TABLE), 10.0, 5.0, 1.0))
+        
+        if self.backend == "tsvector" and tokens:
+            ts_query = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+            search_vector = literal_column("fragrances.search_vector")
+            return query.filter(search_vector.op("@@")(ts_query)).order_by(
+                func.ts_rank_cd(search_vector, ts_query).desc()
+            )
+        
+        search_term = f"%{q}%"
+        return query.filter(
+            or_(
+                Fragrance.name.ilike(search_term),
+                Fragrance.brand.ilike(search_term),
+                Fragrance.description.ilike(search_term)
+            )
+        )
+    
+    def metrics(self) -> dict:
+        return {"backend": self.backend or "ilike"}
+
+
+full_text_search = FullTextSearch()
+
+
+def get_full_text_search() -> FullTextSearch:
+    return full_text_search
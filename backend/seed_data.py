@@ -1,7 +1,11 @@
 from backend.database import SessionLocal, engine, Base
 from backend.models import Fragrance
 from backend.ml_model import ScentRecognitionModel
+from backend.catalog import get_catalog
 import random
+import numpy as np
+
+SEED_VECTOR_SEED = 42
 
 FRAGRANCES_DATA = [
     {
@@ -881,14 +885,9 @@ def seed_fragrances():
             print(f"Database already has {existing_count} fragrances. Skipping seed.")
             return
         
-        for data in FRAGRANCES_DATA:
-            notes_profile = {
-                "top_notes": data.get("top_notes", []),
-                "mid_notes": data.get("mid_notes", []),
-                "base_notes": data.get("base_notes", [])
-            }
-            voc_vector = ml_model.generate_synthetic_vector(notes_profile)
-            
+        voc_vectors = ml_model.generate_synthetic_vectors(FRAGRANCES_DATA, np.random.default_rng(SEED_VECTOR_SEED))
+        
+        for data, voc_vector in zip(FRAGRANCES_DATA, voc_vectors.tolist()):
             fragrance = Fragrance(
                 name=data["name"],
                 brand=data["brand"],
@@ -911,6 +910,7 @@ def seed_fragrances():
             db.add(fragrance)
         
         db.commit()
+        get_catalog().invalidate()
         print(f"Successfully seeded {len(FRAGRANCES_DATA)} fragrances!")
         
     except Exception as e:
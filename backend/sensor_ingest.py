@@ -0,0 +1,287 @@
+import json
+import os
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Sequence
+import numpy as np
+from sqlalchemy import insert, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from backend.models import SensorBucket
+from backend.vector_codec import VECTOR_DTYPE
+
+BUCKET_SECONDS = int(os.environ.get("SCENT_SENSOR_BUCKET_SECONDS", 60))
+MAX_FRAMES = int(os.environ.get("SCENT_INGEST_MAX_FRAMES", 500000))
+VECTOR_SIZE = 16
+
+FRAME_MAGIC = b"SCF1"
+HEADER = struct.Struct("<4sHH")
+SCALAR_DTYPE = np.dtype("<f4")
+EPOCH = datetime(1970, 1, 1)
+MAX_TIMESTAMP = (datetime(9999, 12, 31) - EPOCH).total_seconds()
+MAX_DEVICE_ID_LENGTH = 100
+MERGE_LOOKUP_SIZE = 500
+
+
+class IngestError(ValueError):
+    pass
+
+
+class FrameBatch(NamedTuple):
+    device_ids: List[str]
+    devices: np.ndarray
+    timestamps: np.ndarray
+    readings: np.ndarray
+    temperatures: np.ndarray
+    humidities: np.ndarray
+
+
+def frame_dtype(vector_size: int) -> np.dtype:
+    return np.dtype([
+        ("device", "<u2"),
+        ("timestamp", "<f8"),
+        ("temperature", "<f4"),
+        ("humidity", "<f4"),
+        ("readings", "<f4", (vector_size,)),
+    ])
+
+
+def pack_frames(batch: FrameBatch) -> bytes:
+    vector_size = batch.readings.shape[1]
+    header = HEADER.pack(FRAME_MAGIC, vector_size, len(batch.device_ids))
+    names = b"".join(
+        struct.pack("<B", len(encoded)) + encoded
+        for encoded in (device_id.encode() for device_id in batch.device_ids)
+    )
+    frames = np.empty(len(batch.devices), dtype=frame_dtype(vector_size))
+    frames["device"] = batch.devices
+    frames["timestamp"] = batch.timestamps
+    frames["temperature"] = batch.temperatures
+    frames["humidity"] = batch.humidities
+    frames["readings"] = batch.readings
+    return header + names + frames.tobytes()
+
+
+def _check_device_ids(device_ids: List[str]):
+    for device_id in device_ids:
+        if not device_id or len(device_id) > MAX_DEVICE_ID_LENGTH:
+            raise IngestError(f"Device id must be 1 to {MAX_DEVICE_ID_LENGTH} characters")
+
+
+def _fill_timestamps(timestamps: np.ndarray, now: Optional[float]) -> np.ndarray:
+    timestamps[np.isnan(timestamps)] = now if now is not None else time.time()
+    if not ((timestamps >= 0) & (timestamps <= MAX_TIMESTAMP)).all():
+        raise IngestError("Frame timestamp is out of range")
+    return timestamps
+
+
+def parse_binary(body: bytes, now: Optional[float] = None) -> FrameBatch:
+    if len(body) < HEADER.size:
+        raise IngestError("Truncated frame header")
+    magic, vector_size, device_count = HEADER.unpack_from(body)
+    if magic != FRAME_MAGIC:
+        raise IngestError("Unknown frame format")
+    
+    position = HEADER.size
+    device_ids = []
+    for _ in range(device_count):
+        if position >= len(body):
+            raise IngestError("Truncated device table")
+        length = body[position]
+        try:
+            device_ids.append(body[position + 1:position + 1 + length].decode())
+        except UnicodeDecodeError:
+            raise IngestError("Device id is not valid UTF-8")
+        position += 1 + length
+    _check_device_ids(device_ids)
+    
+    dtype = frame_dtype(vector_size)
+    if (len(body) - position) % dtype.itemsize:
+        raise IngestError("Frame payload is not a whole number of frames")
+    frames = np.frombuffer(body, dtype=dtype, offset=position)
+    if len(frames) > MAX_FRAMES:
+        raise IngestError(f"Batch exceeds limit of {MAX_FRAMES} frames")
+    if len(frames) and int(frames["device"].max()) >= device_count:
+        raise IngestError("Frame references an unknown device")
+    
+    return FrameBatch(
+        device_ids=device_ids,
+        devices=frames["device"].astype(np.int64),
+        timestamps=_fill_timestamps(frames["timestamp"].astype(np.float64), now),
+        readings=np.ascontiguousarray(frames["readings"], dtype=VECTOR_DTYPE),
+        temperatures=np.ascontiguousarray(frames["temperature"], dtype=SCALAR_DTYPE),
+        humidities=np.ascontiguousarray(frames["humidity"], dtype=SCALAR_DTYPE),
+    )
+
+
+def _readings_matrix(vectors: Sequence, vector_size: int) -> np.ndarray:
+    try:
+        dense = np.array(vectors, dtype=VECTOR_DTYPE)
+    except ValueError:
+        dense = None
+    if dense is not None and dense.ndim == 2:
+        matrix = np.zeros((len(vectors), vector_size), dtype=VECTOR_DTYPE)
+        width = min(dense.shape[1], vector_size)
+        matrix[:, :width] = dense[:, :width]
+        return matrix
+    
+    matrix = np.zeros((len(vectors), vector_size), dtype=VECTOR_DTYPE)
+    for i, vector in enumerate(vectors):
+        vector = vector[:vector_size]
+        matrix[i, :len(vector)] = vector
+    return matrix
+
+
+def parse_ndjson(body: bytes, now: Optional[float] = None, vector_size: int = VECTOR_SIZE) -> FrameBatch:
+    lines = [line for line in body.split(b"\n") if line.strip()]
+    if len(lines) > MAX_FRAMES:
+        raise IngestError(f"Batch exceeds limit of {MAX_FRAMES} frames")
+    try:
+        records = json.loads(b"[" + b",".join(lines) + b"]")
+        names = [record["device_id"] for record in records]
+        vectors = [record["voc_vector"] for record in records]
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+        raise IngestError(f"Invalid NDJSON frame: {e}")
+    
+    try:
+        device_ids, devices = np.unique(np.array(names, dtype=str), return_inverse=True)
+        timestamps = np.array([record.get("timestamp") for record in records], dtype=np.float64)
+        temperatures = np.array([record.get("temperature") for record in records], dtype=SCALAR_DTYPE)
+        humidities = np.array([record.get("humidity") for record in records], dtype=SCALAR_DTYPE)
+        readings = _readings_matrix(vectors, vector_size)
+    except (TypeError, ValueError) as e:
+        raise IngestError(f"Invalid NDJSON frame: {e}")
+    _check_device_ids(device_ids.tolist())
+    
+    return FrameBatch(
+        device_ids=device_ids.tolist(),
+        devices=devices.astype(np.int64),
+        timestamps=_fill_timestamps(timestamps, now),
+        readings=readings,
+        temperatures=temperatures,
+        humidities=humidities,
+    )
+
+
+def bucket_rows(batch: FrameBatch, bucket_seconds: int = BUCKET_SECONDS) -> List[dict]:
+    if len(batch.devices) == 0:
+        return []
+    
+    buckets = np.floor(batch.timestamps / bucket_seconds).astype(np.int64)
+    order = np.lexsort((batch.timestamps, buckets, batch.devices))
+    devices = batch.devices[order]
+    buckets = buckets[order]
+    offsets = (batch.timestamps[order] - buckets * bucket_seconds).astype(SCALAR_DTYPE)
+    readings = batch.readings[order]
+    temperatures = batch.temperatures[order]
+    humidities = batch.humidities[order]
+    
+    boundaries = np.flatnonzero((np.diff(devices) != 0) | (np.diff(buckets) != 0)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [len(devices)]))
+    vector_size = readings.shape[1]
+    
+    return [
+        {
+            "device_id": batch.device_ids[devices[start]],
+            "bucket_start": EPOCH + timedelta(seconds=int(buckets[start]) * bucket_seconds),
+            "frame_count": int(end - start),
+            "vector_size": vector_size,
+            "offsets": offsets[start:end].tobytes(),
+            "readings": readings[start:end].tobytes(),
+            "temperatures": temperatures[start:end].tobytes(),
+            "humidities": humidities[start:end].tobytes(),
+        }
+        for start, end in zip(starts.tolist(), ends.tolist())
+    ]
+
+
+def unpack_bucket(bucket: SensorBucket) -> dict:
+    offsets = np.frombuffer(bucket.offsets, dtype=SCALAR_DTYPE)
+    return {
+        "timestamps": (bucket.bucket_start - EPOCH).total_seconds() + offsets.astype(np.float64),
+        "readings": np.frombuffer(bucket.readings, dtype=VECTOR_DTYPE).reshape(-1, bucket.vector_size),
+        "temperatures": np.frombuffer(bucket.temperatures, dtype=SCALAR_DTYPE),
+        "humidities": np.frombuffer(bucket.humidities, dtype=SCALAR_DTYPE),
+    }
+
+
+def _widen(readings: bytes, vector_size: int, width: int) -> np.ndarray:
+    matrix = np.frombuffer(readings, dtype=VECTOR_DTYPE).reshape(-1, vector_size)
+    if vector_size == width:
+        return matrix
+    widened = np.zeros((len(matrix), width), dtype=VECTOR_DTYPE)
+    widened[:, :vector_size] = matrix
+    return widened
+
+
+def merge_bucket(bucket: SensorBucket, row: dict):
+    width = max(bucket.vector_size, row["vector_size"])
+    offsets = np.concatenate((
+        np.frombuffer(bucket.offsets, dtype=SCALAR_DTYPE),
+        np.frombuffer(row["offsets"], dtype=SCALAR_DTYPE),
+    ))
+    order = np.argsort(offsets, kind="stable")
+    readings = np.concatenate((
+        _widen(bucket.readings, bucket.vector_size, width),
+        _widen(row["readings"], row["vector_size"], width),
+    ))
+    temperatures = np.concatenate((
+        np.frombuffer(bucket.temperatures, dtype=SCALAR_DTYPE),
+        np.frombuffer(row["temperatures"], dtype=SCALAR_DTYPE),
+    ))
+    humidities = np.concatenate((
+        np.frombuffer(bucket.humidities, dtype=SCALAR_DTYPE),
+        np.frombuffer(row["humidities"], dtype=SCALAR_DTYPE),
+    ))
+    
+    bucket.frame_count = len(offsets)
+    bucket.vector_size = width
+    bucket.offsets = offsets[order].tobytes()
+    bucket.readings = readings[order].tobytes()
+    bucket.temperatures = temperatures[order].tobytes()
+    bucket.humidities = humidities[order].tobytes()
+
+
+def _existing_buckets(db: Session, rows: List[dict]) -> dict:
+    keys = [(row["device_id"], row["bucket_start"]) for row in rows]
+    existing = {}
+    for i in range(0, len(keys), MERGE_LOOKUP_SIZE):
+        buckets = db.query(SensorBucket).filter(
+            tuple_(SensorBucket.device_id, SensorBucket.bucket_start).in_(keys[i:i + MERGE_LOOKUP_SIZE])
+        ).with_for_update().all()
+        existing.update(((bucket.device_id, bucket.bucket_start), bucket) for bucket in buckets)
+    return existing
+
+
+def _store_rows(db: Session, rows: List[dict]) -> int:
+    existing = _existing_buckets(db, rows)
+    new_rows = []
+    for row in rows:
+        bucket = existing.get((row["device_id"], row["bucket_start"]))
+        if bucket is None:
+            new_rows.append(row)
+        else:
+            merge_bucket(bucket, row)
+    if new_rows:
+        db.execute(insert(SensorBucket), new_rows)
+    db.commit()
+    return len(rows) - len(new_rows)
+
+
+def ingest(db: Session, batch: FrameBatch) -> dict:
+    rows = bucket_rows(batch)
+    merged = 0
+    if rows:
+        try:
+            merged = _store_rows(db, rows)
+        except IntegrityError:
+            db.rollback()
+            merged = _store_rows(db, rows)
+    return {
+        "frames": len(batch.devices),
+        "devices": len({row["device_id"] for row in rows}),
+        "buckets": len(rows),
+        "merged": merged,
+    }
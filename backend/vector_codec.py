@@ -0,0 +1,66 @@
+import json
+import numpy as np
+from typing import List, Optional, Sequence, Tuple, Union
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+VECTOR_DTYPE = np.dtype('<f4')
+
+
+def pack_vector(vector: Union[Sequence[float], np.ndarray]) -> bytes:
+    return np.asarray(vector, dtype=VECTOR_DTYPE).tobytes()
+
+
+def unpack_vector(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype=VECTOR_DTYPE)
+
+
+def unpack_vectors(blobs: Sequence[Optional[bytes]], width: int) -> Tuple[np.ndarray, np.ndarray]:
+    matrix = np.zeros((len(blobs), width), dtype=VECTOR_DTYPE)
+    lengths = np.fromiter((len(blob) if blob is not None else 0 for blob in blobs), dtype=np.int64, count=len(blobs))
+    valid = lengths > 0
+    
+    full = lengths == width * VECTOR_DTYPE.itemsize
+    if full.any():
+        packed = b"".join(blob for blob, is_full in zip(blobs, full) if is_full)
+        matrix[full] = np.frombuffer(packed, dtype=VECTOR_DTYPE).reshape(-1, width)
+    
+    for row in np.flatnonzero(valid & ~full):
+        blob = blobs[row]
+        vector = unpack_vector(blob[:len(blob) // VECTOR_DTYPE.itemsize * VECTOR_DTYPE.itemsize])[:width]
+        matrix[row, :len(vector)] = vector
+    
+    return matrix, valid
+
+
+def pack_json_vector(value: Union[str, List[float], None]) -> Optional[bytes]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return b""
+    try:
+        return pack_vector([float(x) for x in value])
+    except (TypeError, ValueError):
+        return b""
+
+
+class PackedVector(TypeDecorator):
+    impl = LargeBinary
+    cache_ok = True
+    hashable = False
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return bytes(value)
+        return pack_vector(value)
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, str):
+            return json.loads(value)
+        return unpack_vector(value).tolist()
@@ -0,0 +1,207 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Iterable, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from backend.database import Base, SessionLocal
+
+ENABLED = os.environ.get("SCENT_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+MAX_QUEUE_SIZE = int(os.environ.get("SCENT_WRITE_BEHIND_QUEUE_SIZE", 10000))
+BATCH_SIZE = int(os.environ.get("SCENT_WRITE_BEHIND_BATCH_SIZE", 1000))
+INTERVAL_SECONDS = float(os.environ.get("SCENT_WRITE_BEHIND_INTERVAL_SECONDS", 1.0))
+LINGER_SECONDS = float(os.environ.get("SCENT_WRITE_BEHIND_LINGER_SECONDS", 0.05))
+WAIT_TIMEOUT_SECONDS = float(os.environ.get("SCENT_WRITE_BEHIND_WAIT_SECONDS", 5.0))
+MAX_ATTEMPTS = int(os.environ.get("SCENT_WRITE_BEHIND_MAX_ATTEMPTS", 3))
+DEAD_LETTER_SIZE = int(os.environ.get("SCENT_WRITE_BEHIND_DEAD_LETTER_SIZE", 1000))
+
+
+def table_order() -> dict:
+    return {table.name: i for i, table in enumerate(Base.metadata.sorted_tables)}
+
+
+def write_rows(db: Session, rows: Iterable[Tuple[type, dict]]):
+    grouped = {}
+    for model, values in rows:
+        grouped.setdefault(model, []).append(values)
+    order = table_order()
+    for model in sorted(grouped, key=lambda m: order[m.__tablename__]):
+        db.execute(insert(model), grouped[model])
+
+
+class WriteBehindWriter:
+    def __init__(self, enabled: bool = ENABLED, max_queue_size: int = MAX_QUEUE_SIZE,
+                 batch_size: int = BATCH_SIZE, interval_seconds: float = INTERVAL_SECONDS,
+                 linger_seconds: float = LINGER_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.enabled = enabled
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self.linger_seconds = linger_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._items = deque()
+        self._pending_by_owner = Counter()
+        self._condition = threading.Condition()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.rows_lost = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.recent_flushes = deque(maxlen=20)
+        self.dead_letters = deque(maxlen=DEAD_LETTER_SIZE)
+    
+    @property
+    def running(self) -> bool:
+        return self.enabled and self._thread is not None and self._thread.is_alive()
+    
+    def submit(self, owner: str, rows: List[Tuple[type, dict]]) -> bool:
+        if not self.running:
+            return False
+        with self._condition:
+            if len(self._items) + len(rows) > self.max_queue_size:
+                self.rows_rejected += len(rows)
+                return False
+            self._items.extend((owner, model, values) for model, values in rows)
+            self._pending_by_owner[owner] += len(rows)
+            self._condition.notify_all()
+        return True
+    
+    def persist(self, db: Session, owner: str, rows: List[Tuple[type, dict]]):
+        if self.submit(owner, rows):
+            return
+        write_rows(db, rows)
+        db.commit()
+    
+    def has_pending(self, owner: str) -> bool:
+        return self._pending_by_owner.get(owner, 0) > 0
+    
+    def wait_for(self, owner: str, timeout: float = WAIT_TIMEOUT_SECONDS) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending_by_owner.get(owner, 0) == 0, timeout)
+    
+    async def settle(self, owner: str):
+        if self.has_pending(owner):
+            await run_in_threadpool(self.wait_for, owner)
+    
+    def _take_batch(self) -> list:
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._stopping.is_set(), self.interval_seconds)
+            if self._items and len(self._items) < self.batch_size and not self._stopping.is_set():
+                self._condition.wait_for(
+                    lambda: len(self._items) >= self.batch_size or self._stopping.is_set(),
+                    self.linger_seconds
+                )
+            count = min(len(self._items), self.batch_size)
+            return [self._items.popleft() for _ in range(count)]
+    
+    def _finish_batch(self, batch: list):
+        with self._condition:
+            for owner, _, _ in batch:
+                self._pending_by_owner[owner] -= 1
+                if self._pending_by_owner[owner] <= 0:
+                    del self._pending_by_owner[owner]
+            self._condition.notify_all()
+    
+    def flush_batch(self, batch: list) -> dict:
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            write_rows(db, [(model, values) for _, model, values in batch])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        
+        seconds = time.perf_counter() - start
+        report = {
+            "rows": len(batch),
+            "seconds": seconds,
+            "rows_per_second": len(batch) / seconds if seconds > 0 else 0.0,
+        }
+        self.rows_written += len(batch)
+        self.flushes += 1
+        self.recent_flushes.append(report)
+        return report
+    
+    def _flush_with_retries(self, batch: list):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.flush_batch(batch)
+                return
+            except Exception as e:
+                self.failed_flushes += 1
+                print(f"Warning: Write-behind flush of {len(batch)} rows failed (attempt {attempt}): {e}")
+                if attempt == self.max_attempts or self._stopping.is_set():
+                    break
+                self._stopping.wait(self.interval_seconds)
+        
+        order = table_order()
+        for item in sorted(batch, key=lambda item: order[item[1].__tablename__]):
+            try:
+                self.flush_batch([item])
+            except Exception as e:
+                owner, model, values = item
+                self.rows_lost += 1
+                self.dead_letters.append({
+                    "owner": owner,
+                    "table": model.__tablename__,
+                    "values": values,
+                    "error": str(e),
+                })
+                print(f"Warning: Write-behind dropped a {model.__tablename__} row for {owner}: {e}")
+    
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                if self._stopping.is_set():
+                    return
+                continue
+            self._flush_with_retries(batch)
+            self._finish_batch(batch)
+    
+    def start(self):
+        if not self.enabled or self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stopping.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def metrics(self) -> dict:
+        flush_sizes = [report["rows"] for report in self.recent_flushes]
+        flush_seconds = [report["seconds"] for report in self.recent_flushes]
+        return {
+            "enabled": self.enabled,
+            "queue_depth": len(self._items),
+            "max_queue_size": self.max_queue_size,
+            "rows_written": self.rows_written,
+            "rows_rejected": self.rows_rejected,
+            "rows_lost": self.rows_lost,
+            "dead_letters": len(self.dead_letters),
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "avg_flush_size": sum(flush_sizes) / len(flush_sizes) if flush_sizes else 0.0,
+            "avg_flush_seconds": sum(flush_seconds) / len(flush_seconds) if flush_seconds else 0.0,
+            "recent_flushes": list(self.recent_flushes),
+        }
+
+
+writer = WriteBehindWriter()
+
+
+def get_write_behind() -> WriteBehindWriter:
+    return writer
@@ -0,0 +1 @@
+# ScentID Benchmarks
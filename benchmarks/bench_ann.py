@@ -0,0 +1,85 @@
+import argparse
+import time
+import numpy as np
+from backend.ml_model import ScentRecognitionModel
+
+DEFAULT_PROBES = [1, 2, 4, 8, 16, 32]
+
+
+def clustered_catalog(size: int, vector_size: int, rng: np.random.Generator, cluster_size: int = 50) -> np.ndarray:
+    n_clusters = max(1, size // cluster_size)
+    centers = rng.gamma(0.6, 1.0, (n_clusters, vector_size))
+    catalog = centers[rng.integers(0, n_clusters, size)] + rng.normal(0, 0.15, (size, vector_size))
+    catalog = np.clip(catalog, 0, None).astype(np.float32)
+    return catalog / np.maximum(catalog.max(axis=1, keepdims=True), 1e-6)
+
+
+def noisy_queries(catalog: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    queries = catalog[rng.integers(0, len(catalog), count)] + rng.normal(0, 0.05, (count, catalog.shape[1]))
+    queries = np.clip(queries, 0, None).astype(np.float32)
+    return queries / np.maximum(queries.max(axis=1, keepdims=True), 1e-6)
+
+
+def recall_at_k(approximate: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(np.intersect1d(a[a >= 0], e)) for a, e in zip(approximate, exact))
+    return hits / exact.size
+
+
+def single_query_latency(model: ScentRecognitionModel, queries: np.ndarray, top_k: int) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        model.index.search(query.reshape(1, -1), top_k)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def run(size: int, n_lists: int, probes: list, queries_count: int, top_k: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vector_size = ScentRecognitionModel().vector_size
+    catalog = clustered_catalog(size, vector_size, rng)
+    queries = noisy_queries(catalog, queries_count, rng)
+    ids = [str(i) for i in range(size)]
+    
+    exact = ScentRecognitionModel(engine="numpy")
+    exact.fit_vectors(catalog, ids)
+    _, exact_indices = exact.index.search(queries, top_k)
+    exact_us = single_query_latency(exact, queries[:200], top_k) * 1e6
+    print(f"catalog={size} exact: build {exact.index.build_seconds * 1000:.1f} ms, single query {exact_us:.1f} us")
+    
+    index_params = {"n_probe": probes[0]}
+    if n_lists:
+        index_params["n_lists"] = n_lists
+    approximate = ScentRecognitionModel(engine="ivf", index_params=index_params)
+    approximate.fit_vectors(catalog, ids)
+    metrics = approximate.index.metrics()
+    print(
+        f"ivf: build {metrics['build_seconds'] * 1000:.1f} ms (k-means {metrics['train_seconds'] * 1000:.1f} ms), "
+        f"{metrics['n_lists']} lists of {metrics['list_size_mean']:.1f} mean size"
+    )
+    
+    print(f"{'n_probe':>8} {f'recall@{top_k}':>10} {'single us':>10} {'speedup':>8} {'candidates':>11}")
+    for n_probe in probes:
+        approximate.index.n_probe = n_probe
+        approximate.index.query_count = 0
+        approximate.index.candidates_scanned = 0
+        _, approximate_indices = approximate.index.search(queries, top_k)
+        recall = recall_at_k(approximate_indices, exact_indices)
+        candidates = approximate.index.metrics()["candidates_per_query"]
+        approximate_us = single_query_latency(approximate, queries[:200], top_k) * 1e6
+        print(f"{n_probe:>8} {recall:>10.3f} {approximate_us:>10.1f} {exact_us / approximate_us:>8.1f} {candidates:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall vs latency of the IVF index against exact search")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--lists", type=int, default=0)
+    parser.add_argument("--probes", type=int, nargs="+", default=DEFAULT_PROBES)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    run(args.size, args.lists, args.probes, args.queries, args.top_k, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import time
+import numpy as np
+from backend.autocomplete import AutocompleteIndex
+from benchmarks.bench_note_index import build_records
+
+DEFAULT_QUERIES = ["noir velvet 12", "dior homme", "maison", "vanilla"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-keystroke autocomplete latency")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=8)
+    parser.add_argument("--changes", type=int, default=1000)
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    records = build_records(args.size, args.seed)
+    start = time.perf_counter()
+    index = AutocompleteIndex(1, records)
+    print(f"built index in {time.perf_counter() - start:.1f}s: {index.metrics()}")
+    
+    rng = np.random.default_rng(args.seed)
+    ids = list(records)
+    changed = {ids[i] for i in rng.choice(len(ids), args.changes, replace=False).tolist()}
+    updated = dict(records)
+    for fragrance_id in changed:
+        updated[fragrance_id] = updated[fragrance_id]._replace(avg_rating=float(rng.uniform(1, 5)))
+    start = time.perf_counter()
+    index = index.apply(2, updated, changed)
+    print(f"applied {len(changed)} changes in {time.perf_counter() - start:.2f}s")
+    
+    print(f"{'prefix':>16} {'cold us':>8} {'warm us':>8}")
+    for query in args.queries:
+        for end in range(1, len(query) + 1):
+            prefix = query[:end]
+            start = time.perf_counter()
+            index.suggest(prefix, args.limit)
+            cold = (time.perf_counter() - start) * 1e6
+            start = time.perf_counter()
+            for _ in range(args.repeats):
+                index.suggest(prefix, args.limit)
+            warm = (time.perf_counter() - start) / args.repeats * 1e6
+            print(f"{prefix:>16} {cold:>8.0f} {warm:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
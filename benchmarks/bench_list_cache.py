@@ -0,0 +1,72 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+
+def timed(call, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        call()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def run(rows: int, repeats: int, limit: int, seed: int):
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'lists.db')}"
+        from pydantic import TypeAdapter
+        from backend.catalog import get_catalog
+        from backend.database import Base, SessionLocal, engine
+        from backend.list_cache import ListCache, brand_list, popular_list
+        from backend.models import Fragrance
+        from backend.schemas import FragranceListResponse
+        from benchmarks.synthetic_catalog import generate_catalog, populate
+        
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        populate(db, generate_catalog(rows, seed), seed)
+        catalog = get_catalog()
+        catalog.records(db)
+        adapter = TypeAdapter(List[FragranceListResponse])
+        favorites = set(list(catalog.records(db))[:1000])
+        
+        def popular_query() -> bytes:
+            ids = [row.id for row in db.query(Fragrance.id).order_by(
+                Fragrance.avg_rating.desc(), Fragrance.review_count.desc()
+            ).limit(limit).all()]
+            return adapter.dump_json([r.list_item(r.id in favorites) for r in catalog.get_many(db, ids)])
+        
+        def brands_query() -> bytes:
+            brands = db.query(Fragrance.brand).distinct().order_by(Fragrance.brand).all()
+            return TypeAdapter(List[str]).dump_json([b[0] for b in brands if b[0]])
+        
+        cache = ListCache()
+        popular = lambda: cache.get(db, ("popular", limit), lambda records: popular_list(records, limit))
+        brands = lambda: cache.get(db, ("brands",), brand_list)
+        start = time.perf_counter()
+        popular()
+        brands()
+        print(f"rows={rows} cache fill {(time.perf_counter() - start) * 1000:.0f} ms")
+        favorites |= set(popular().ids[::5])
+        
+        print(f"{'query':>10} {'sql ms':>8} {'cached ms':>10} {'overlay ms':>11}")
+        print(f"{'popular':>10} {timed(popular_query, repeats):>8.3f} {timed(lambda: popular().render(), repeats):>10.3f} "
+              f"{timed(lambda: popular().render(favorites), repeats):>11.3f}")
+        print(f"{'brands':>10} {timed(brands_query, repeats):>8.3f} {timed(lambda: brands().render(), repeats):>10.3f}")
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare list queries against the catalog-versioned list cache")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    run(args.rows, args.repeats, args.limit, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+
+SCENARIOS = ("scan", "fragrances", "history")
+
+
+def latency_summary(latencies: list, errors: int, seconds: float) -> dict:
+    values = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "throughput_rps": len(latencies) / seconds if seconds > 0 else 0.0,
+        "latency_ms": {
+            "mean": float(values.mean()) if len(values) else 0.0,
+            "p50": float(np.percentile(values, 50)) if len(values) else 0.0,
+            "p95": float(np.percentile(values, 95)) if len(values) else 0.0,
+            "p99": float(np.percentile(values, 99)) if len(values) else 0.0,
+            "max": float(values.max()) if len(values) else 0.0,
+        },
+    }
+
+
+async def drive(client, make_request, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+    
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            method, url, kwargs = make_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+    
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return latency_summary(latencies, errors, time.perf_counter() - start)
+
+
+def prepare_database(fragrances: int, history_scans: int, seed: int) -> str:
+    from sqlalchemy import insert
+    from backend.auth import create_access_token, get_password_hash
+    from backend.database import Base, SessionLocal, engine
+    from backend.models import Fragrance, Scan, User, generate_uuid
+    from benchmarks.synthetic_catalog import generate_catalog, populate
+    
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        populate(db, generate_catalog(fragrances, seed), seed)
+        user = User(email="load@bench.local", password_hash=get_password_hash("bench"), name="Load Bench")
+        db.add(user)
+        db.commit()
+        
+        rng = np.random.default_rng(seed)
+        fragrance_ids = [row.id for row in db.query(Fragrance.id).all()]
+        now = datetime.utcnow()
+        db.execute(insert(Scan), [
+            {
+                "id": generate_uuid(),
+                "user_id": user.id,
+                "fragrance_id": fragrance_ids[rng.integers(len(fragrance_ids))],
+                "raw_voc_vector": rng.random(16).tolist(),
+                "confidence_score": float(rng.random()),
+                "alternative_matches": [],
+                "scanned_at": now - timedelta(seconds=i),
+            }
+            for i in range(history_scans)
+        ])
+        db.commit()
+        return create_access_token(data={"sub": user.id})
+    finally:
+        db.close()
+
+
+async def run_scenarios(token: str, scenarios: list, requests: int, concurrency: int, seed: int) -> dict:
+    import httpx
+    from backend.main import app
+    from backend.models import Fragrance
+    from backend.database import SessionLocal
+    
+    db = SessionLocal()
+    brands = [row.brand for row in db.query(Fragrance.brand).distinct().limit(200).all()]
+    db.close()
+    
+    rng = np.random.default_rng(seed)
+    queries = np.clip(rng.random((requests, 16)), 0, 1).round(4).tolist()
+    headers = {"Authorization": f"Bearer {token}"}
+    make_requests = {
+        "scan": lambda i: ("POST", "/api/scans/", {"json": {"voc_vector": queries[i]}, "headers": headers}),
+        "fragrances": lambda i: ("GET", "/api/fragrances/", {
+            "params": {"brand": brands[i % len(brands)]} if i % 2 else {"limit": 20, "offset": i % 500},
+            "headers": headers,
+        }),
+        "history": lambda i: ("GET", "/api/scans/history", {"params": {"limit": 50}, "headers": headers}),
+    }
+    
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in scenarios:
+                await drive(client, make_requests[name], min(requests, 20), concurrency)
+                results[name] = await drive(client, make_requests[name], requests, concurrency)
+    return results
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = args.database or f"sqlite:///{os.path.join(directory, 'load.db')}"
+        os.environ.setdefault("SCENT_MODEL_SNAPSHOT_DIR", os.path.join(directory, "model_snapshot"))
+        
+        start = time.perf_counter()
+        token = prepare_database(args.fragrances, args.history_scans, args.seed)
+        setup_seconds = time.perf_counter() - start
+        
+        scenarios = asyncio.run(run_scenarios(token, args.scenarios, args.requests, args.concurrency, args.seed))
+    
+    return {
+        "config": {
+            "fragrances": args.fragrances,
+            "history_scans": args.history_scans,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "engine": os.environ.get("SCENT_MODEL_ENGINE", "numpy"),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.utcnow().isoformat(),
+        },
+        "setup_seconds": setup_seconds,
+        "scenarios": scenarios,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the API in-process and report throughput and latency percentiles")
+    parser.add_argument("--fragrances", type=int, default=1000)
+    parser.add_argument("--history-scans", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--database", help="database URL to benchmark against (defaults to a fresh temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this path")
+    args = parser.parse_args()
+    
+    report = run(args)
+    
+    print(f"fragrances={args.fragrances} requests={args.requests} concurrency={args.concurrency}")
+    print(f"{'scenario':>12} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(f"{name:>12} {result['throughput_rps']:>9.1f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+              f"{latency['p99']:>8.2f} {result['errors']:>7}")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import time
+import numpy as np
+from backend.ml_model import ScentRecognitionModel
+from backend.ml_index import ENGINES
+
+DEFAULT_SIZES = [48, 1000, 10000, 100000, 1000000]
+
+
+def random_catalog(size: int, vector_size: int, rng: np.random.Generator) -> np.ndarray:
+    catalog = rng.gamma(0.6, 1.0, (size, vector_size)).astype(np.float32)
+    return catalog / catalog.max(axis=1, keepdims=True)
+
+
+def time_single_queries(model: ScentRecognitionModel, queries: list, top_k: int) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        model.predict(query, top_k=top_k)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def time_batch_queries(model: ScentRecognitionModel, queries: list, top_k: int) -> float:
+    start = time.perf_counter()
+    model.predict_batch(queries, top_k=top_k)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def run(sizes: list, engines: list, single_queries: int, batch_size: int, top_k: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vector_size = ScentRecognitionModel().vector_size
+    
+    print(f"{'catalog':>10} {'engine':>8} {'fit ms':>10} {'single us':>12} {'batch q/s':>12}")
+    for size in sizes:
+        catalog = random_catalog(size, vector_size, rng)
+        ids = [str(i) for i in range(size)]
+        queries = random_catalog(max(single_queries, batch_size), vector_size, rng).tolist()
+        
+        for engine in engines:
+            model = ScentRecognitionModel(engine=engine)
+            start = time.perf_counter()
+            model.fit_vectors(catalog, ids)
+            fit_ms = (time.perf_counter() - start) * 1000
+            
+            model.predict(queries[0], top_k=top_k)
+            single_us = time_single_queries(model, queries[:single_queries], top_k) * 1e6
+            batch_qps = time_batch_queries(model, queries[:batch_size], top_k)
+            
+            print(f"{size:>10} {engine:>8} {fit_ms:>10.1f} {single_us:>12.1f} {batch_qps:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare scent matching engines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--engines", nargs="+", default=sorted(ENGINES), choices=sorted(ENGINES))
+    parser.add_argument("--single-queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    run(args.sizes, args.engines, args.single_queries, args.batch_size, args.top_k, args.seed)
+
+
+if __name__ == "__main__":
+    main()
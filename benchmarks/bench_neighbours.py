@@ -0,0 +1,28 @@
+import argparse
+import numpy as np
+from backend.neighbours import build_neighbour_table
+
+VECTOR_SIZE = 16
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the all-pairs neighbour table build")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--rows-per-fragrance", type=int, default=4)
+    parser.add_argument("--neighbours", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        vectors = rng.random((size * args.rows_per_fragrance, VECTOR_SIZE), dtype=np.float32)
+        fragrance_ids = [f"f{i:07d}" for i in np.repeat(np.arange(size), args.rows_per_fragrance).tolist()]
+        row_counts = rng.integers(1, 20, len(vectors)).astype(np.float64)
+        table = build_neighbour_table(
+            vectors, row_counts, fragrance_ids, vectors.mean(axis=0), vectors.std(axis=0), args.neighbours
+        )
+        print(f"fragrances={size} {table.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import time
+from backend.catalog import FragranceRecord
+from backend.note_index import NoteIndex, parse_notes
+from benchmarks.synthetic_catalog import generate_catalog
+
+DEFAULT_QUERIES = [
+    "vanilla & oud & !rose",
+    "vanilla & !rose",
+    "bergamot & musk",
+    "oud | incense | leather",
+    "!vanilla",
+]
+
+
+def parse_query(query: str):
+    all_notes, any_notes, exclude_notes = [], [], []
+    for term in query.split("&"):
+        term = term.strip()
+        if term.startswith("!"):
+            exclude_notes += parse_notes([term[1:]])
+        elif "|" in term:
+            any_notes += parse_notes(term.split("|"))
+        else:
+            all_notes += parse_notes([term])
+    return all_notes, any_notes, exclude_notes
+
+
+def build_records(size: int, seed: int) -> dict:
+    records = {}
+    for i, data in enumerate(generate_catalog(size, seed)):
+        fragrance_id = f"f{i:07d}"
+        records[fragrance_id] = FragranceRecord(
+            id=fragrance_id,
+            name=data["name"],
+            brand=data["brand"],
+            gender=data["gender"],
+            concentration=data["concentration"],
+            avg_rating=data["avg_rating"] or 0.0,
+            review_count=data["review_count"] or 0,
+            top_notes=tuple(data["top_notes"]),
+            mid_notes=tuple(data["mid_notes"]),
+            base_notes=tuple(data["base_notes"]),
+            response=None,
+            list_response=None,
+        )
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark boolean note queries against the inverted note index")
+    parser.add_argument("--size", type=int, default=1000000)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    records = build_records(args.size, args.seed)
+    print(f"generated {len(records)} records in {time.perf_counter() - start:.1f}s")
+    
+    start = time.perf_counter()
+    index = NoteIndex(records)
+    print(f"built index in {time.perf_counter() - start:.1f}s: {index.metrics()}")
+    
+    print(f"{'query':>26} {'matches':>8} {'filter us':>9} {'top20 us':>9}")
+    for query in args.queries:
+        all_notes, any_notes, exclude_notes = parse_query(query)
+        matches = index.count(index.filter(all_notes, any_notes, exclude_notes))
+        timings = []
+        for call in (index.filter, index.search):
+            start = time.perf_counter()
+            for _ in range(args.repeats):
+                call(all_notes, any_notes, exclude_notes)
+            timings.append((time.perf_counter() - start) / args.repeats * 1e6)
+        print(f"{query:>26} {matches:>8} {timings[0]:>9.0f} {timings[1]:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+
+DEFAULT_QUERIES = ["dior", "noir", "velvet rose", "vanilla", "sandalwood amber", "citrus", "oud 12", "midnight musk"]
+
+
+def run(rows: int, repeats: int, queries: list, seed: int):
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'search.db')}"
+        from backend.database import Base, SessionLocal, engine
+        from backend.models import Fragrance
+        from backend.search import FullTextSearch
+        from benchmarks.synthetic_catalog import generate_catalog, populate
+        
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        start = time.perf_counter()
+        populate(db, generate_catalog(rows, seed), seed)
+        print(f"rows={rows} populated in {time.perf_counter() - start:.1f}s")
+        
+        ilike = FullTextSearch()
+        fts = FullTextSearch()
+        start = time.perf_counter()
+        fts.ensure(engine)
+        print(f"fts backend={fts.backend} built in {time.perf_counter() - start:.2f}s")
+        
+        print(f"{'query':>18} {'ilike ms':>9} {'fts ms':>8} {'ilike hits':>10} {'fts hits':>9}")
+        totals = np.zeros(2)
+        for q in queries:
+            timings = []
+            hits = []
+            for search in (ilike, fts):
+                query = search.apply(db.query(Fragrance.id), q).order_by(Fragrance.avg_rating.desc())
+                hits.append(query.count())
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    query.limit(20).all()
+                timings.append((time.perf_counter() - start) / repeats * 1000)
+            totals += timings
+            print(f"{q:>18} {timings[0]:>9.2f} {timings[1]:>8.2f} {hits[0]:>10} {hits[1]:>9}")
+        print(f"{'mean':>18} {totals[0] / len(queries):>9.2f} {totals[1] / len(queries):>8.2f}")
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ilike substring search with the full-text index")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--queries", nargs="+", default=DEFAULT_QUERIES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    run(args.rows, args.repeats, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.database import Base
+from backend.sensor_ingest import FrameBatch, bucket_rows, ingest, pack_frames, parse_binary, parse_ndjson
+
+VECTOR_SIZE = 16
+
+
+def make_batch(frames: int, devices: int, seed: int) -> FrameBatch:
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    return FrameBatch(
+        device_ids=[f"device-{i:05d}" for i in range(devices)],
+        devices=rng.integers(0, devices, frames),
+        timestamps=now - rng.random(frames) * 300,
+        readings=rng.random((frames, VECTOR_SIZE), dtype=np.float32),
+        temperatures=rng.uniform(18, 30, frames).astype(np.float32),
+        humidities=rng.uniform(30, 70, frames).astype(np.float32),
+    )
+
+
+def to_ndjson(batch: FrameBatch) -> bytes:
+    return "\n".join(
+        json.dumps({
+            "device_id": batch.device_ids[device],
+            "timestamp": timestamp,
+            "voc_vector": readings,
+            "temperature": temperature,
+            "humidity": humidity,
+        })
+        for device, timestamp, readings, temperature, humidity in zip(
+            batch.devices.tolist(), batch.timestamps.tolist(), batch.readings.tolist(),
+            batch.temperatures.tolist(), batch.humidities.tolist()
+        )
+    ).encode()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(frames: int, devices: int, seed: int):
+    batch = make_batch(frames, devices, seed)
+    ndjson_body = to_ndjson(batch)
+    binary_body = pack_frames(batch)
+    
+    parsed_ndjson, ndjson_seconds = timed(parse_ndjson, ndjson_body)
+    parsed_binary, binary_seconds = timed(parse_binary, binary_body)
+    rows, bucket_seconds = timed(bucket_rows, parsed_binary)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'ingest.db')}")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        report, ingest_seconds = timed(ingest, db, parsed_binary)
+        db.close()
+    
+    print(f"frames={frames} devices={devices} buckets={len(rows)}")
+    print(f"{'stage':>14} {'bytes':>12} {'seconds':>8} {'frames/s':>12}")
+    print(f"{'parse ndjson':>14} {len(ndjson_body):>12} {ndjson_seconds:>8.3f} {frames / ndjson_seconds:>12.0f}")
+    print(f"{'parse binary':>14} {len(binary_body):>12} {binary_seconds:>8.3f} {frames / binary_seconds:>12.0f}")
+    print(f"{'bucket':>14} {'':>12} {bucket_seconds:>8.3f} {frames / bucket_seconds:>12.0f}")
+    print(f"{'bucket+insert':>14} {'':>12} {ingest_seconds:>8.3f} {frames / ingest_seconds:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure sensor frame parsing and bucketed ingest throughput")
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    run(args.frames, args.devices, args.seed)
+
+
+if __name__ == "__main__":
+    main()
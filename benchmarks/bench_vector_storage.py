@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from backend.vector_codec import pack_vector, unpack_vectors
+
+VECTOR_SIZE = 16
+
+
+def database_bytes(path: str, rows: list, column_type: str) -> float:
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE vectors (id INTEGER PRIMARY KEY, vector {column_type})")
+    conn.executemany("INSERT INTO vectors (vector) VALUES (?)", ((row,) for row in rows))
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def load_json(path: str) -> np.ndarray:
+    conn = sqlite3.connect(path)
+    values = [json.loads(value) for (value,) in conn.execute("SELECT vector FROM vectors")]
+    conn.close()
+    return np.array([[float(x) for x in value] for value in values], dtype=np.float32)
+
+
+def load_packed(path: str) -> np.ndarray:
+    conn = sqlite3.connect(path)
+    blobs = [value for (value,) in conn.execute("SELECT vector FROM vectors")]
+    conn.close()
+    matrix, _ = unpack_vectors(blobs, VECTOR_SIZE)
+    return matrix
+
+
+def run(rows: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vectors = rng.random((rows, VECTOR_SIZE))
+    
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "json.db")
+        packed_path = os.path.join(directory, "packed.db")
+        json_bytes = database_bytes(json_path, [json.dumps(vector.tolist()) for vector in vectors], "JSON")
+        packed_bytes = database_bytes(packed_path, [pack_vector(vector) for vector in vectors], "BLOB")
+        
+        start = time.perf_counter()
+        load_json(json_path)
+        json_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        load_packed(packed_path)
+        packed_seconds = time.perf_counter() - start
+    
+    print(f"rows={rows}")
+    print(f"{'format':>8} {'bytes/row':>10} {'load s':>8}")
+    print(f"{'json':>8} {json_bytes / rows:>10.1f} {json_seconds:>8.3f}")
+    print(f"{'packed':>8} {packed_bytes / rows:>10.1f} {packed_seconds:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON and packed float32 vector storage")
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    run(args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
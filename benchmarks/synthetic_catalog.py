@@ -0,0 +1,134 @@
+import argparse
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from backend.database import Base, SessionLocal, engine
+from backend.ml_model import ScentRecognitionModel
+from backend.models import Fragrance
+from backend.seed_data import FRAGRANCES_DATA
+
+TIERS = ("top_notes", "mid_notes", "base_notes")
+NAME_WORDS = (
+    "Noir", "Blanc", "Velvet", "Amber", "Silk", "Midnight", "Solar", "Wild", "Iris", "Cedar", "Smoke", "Bloom",
+    "Ocean", "Desert", "Garden", "Leather", "Oud", "Citrus", "Musk", "Rose", "Storm", "Golden", "Crystal", "Eden",
+)
+BRAND_SUFFIXES = ("Parfums", "Maison", "Atelier", "Studio", "House", "Lab")
+
+
+def note_distributions() -> Dict[str, Tuple[List[str], np.ndarray]]:
+    distributions = {}
+    for tier in TIERS:
+        counts = Counter(note for data in FRAGRANCES_DATA for note in data.get(tier) or [])
+        notes = sorted(counts)
+        weights = np.array([counts[note] for note in notes], dtype=np.float64)
+        distributions[tier] = (notes, weights / weights.sum())
+    return distributions
+
+
+def categorical(field: str) -> Tuple[List[str], np.ndarray]:
+    counts = Counter(data[field] for data in FRAGRANCES_DATA if data.get(field))
+    values = sorted(counts)
+    weights = np.array([counts[value] for value in values], dtype=np.float64)
+    return values, weights / weights.sum()
+
+
+def generate_catalog(size: int, seed: int = 0) -> List[dict]:
+    rng = np.random.default_rng(seed)
+    notes = note_distributions()
+    genders, gender_weights = categorical("gender")
+    concentrations, concentration_weights = categorical("concentration")
+    projections, projection_weights = categorical("projection")
+    
+    seed_brands = sorted({data["brand"] for data in FRAGRANCES_DATA})
+    n_brands = max(len(seed_brands), size // 40)
+    brands = seed_brands + [
+        f"{NAME_WORDS[i % len(NAME_WORDS)]} {BRAND_SUFFIXES[i % len(BRAND_SUFFIXES)]} {i}"
+        for i in range(n_brands - len(seed_brands))
+    ]
+    brand_weights = 1.0 / np.arange(1, len(brands) + 1) ** 0.8
+    brand_weights /= brand_weights.sum()
+    
+    brand_idx = rng.choice(len(brands), size, p=brand_weights)
+    gender_idx = rng.choice(len(genders), size, p=gender_weights)
+    concentration_idx = rng.choice(len(concentrations), size, p=concentration_weights)
+    projection_idx = rng.choice(len(projections), size, p=projection_weights)
+    note_counts = {tier: rng.integers(2, 6, size) for tier in TIERS}
+    name_words = rng.integers(0, len(NAME_WORDS), (size, 2))
+    years = rng.integers(1970, 2025, size)
+    longevity = np.round(rng.uniform(3, 14, size), 1)
+    price_min = np.round(rng.lognormal(4.4, 0.4, size), 0)
+    ratings = np.round(np.clip(rng.normal(4.2, 0.3, size), 1.0, 5.0), 1)
+    reviews = rng.lognormal(6.5, 1.5, size).astype(np.int64)
+    
+    tier_notes = {}
+    for tier in TIERS:
+        tier_names, tier_weights = notes[tier]
+        drawn = rng.choice(len(tier_names), (size, 5), p=tier_weights)
+        tier_notes[tier] = [
+            list(dict.fromkeys(tier_names[j] for j in row[:count]))
+            for row, count in zip(drawn, note_counts[tier])
+        ]
+    
+    return [
+        {
+            "name": f"{NAME_WORDS[name_words[i, 0]]} {NAME_WORDS[name_words[i, 1]]} {i}",
+            "brand": brands[brand_idx[i]],
+            "description": (
+                f"A {concentrations[concentration_idx[i]].lower()} opening on "
+                f"{', '.join(tier_notes['top_notes'][i]).lower()} over a heart of "
+                f"{', '.join(tier_notes['mid_notes'][i]).lower()}."
+            ),
+            "image_url": None,
+            "top_notes": tier_notes["top_notes"][i],
+            "mid_notes": tier_notes["mid_notes"][i],
+            "base_notes": tier_notes["base_notes"][i],
+            "concentration": concentrations[concentration_idx[i]],
+            "gender": genders[gender_idx[i]],
+            "year_released": int(years[i]),
+            "longevity_hours": float(longevity[i]),
+            "projection": projections[projection_idx[i]],
+            "price_min": float(price_min[i]),
+            "price_max": float(price_min[i] * 1.5),
+            "avg_rating": float(ratings[i]),
+            "review_count": int(reviews[i]),
+        }
+        for i in range(size)
+    ]
+
+
+def populate(db: Session, catalog: List[dict], seed: int = 0, batch_size: int = 5000) -> int:
+    model = ScentRecognitionModel()
+    rng = np.random.default_rng(seed)
+    for start in range(0, len(catalog), batch_size):
+        chunk = catalog[start:start + batch_size]
+        vectors = model.generate_synthetic_vectors(chunk, rng)
+        db.execute(insert(Fragrance), [
+            dict(data, voc_signature_vector=vector)
+            for data, vector in zip(chunk, vectors)
+        ])
+        db.commit()
+    return len(catalog)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the configured database with a seeded synthetic fragrance catalog")
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    catalog = generate_catalog(args.size, args.seed)
+    db = SessionLocal()
+    try:
+        populate(db, catalog, args.seed)
+    finally:
+        db.close()
+    print(f"Inserted {args.size} synthetic fragrances in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
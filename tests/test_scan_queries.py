@@ -0,0 +1,88 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+TEMP_DIR = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEMP_DIR, 'scentid.db')}"
+os.environ["SCENT_MODEL_SNAPSHOT_DIR"] = os.path.join(TEMP_DIR, "model_snapshot")
+os.environ["SCENT_CATALOG_CHECK_SECONDS"] = "3600"
+os.environ["SCENT_CALIBRATION_CHECK_SECONDS"] = "3600"
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from backend.database import engine
+from backend.feedback_pipeline import get_feedback_pipeline
+from backend.main import app
+from backend.model_registry import get_registry
+
+CREATE_QUERIES = 3
+GET_QUERIES = 3
+HISTORY_QUERIES = 3
+
+
+@contextmanager
+def count_queries():
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        get_registry().stop()
+        get_feedback_pipeline().stop()
+        yield client
+
+
+@pytest.fixture(scope="module")
+def headers(client):
+    response = client.post("/api/auth/signup", json={"email": "queries@example.com", "password": "secret"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def create_scan(client, headers, seed):
+    vector = np.random.default_rng(seed).random(16).tolist()
+    response = client.post("/api/scans/", json={"voc_vector": vector}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_create_scan_runs_fixed_query_count(client, headers):
+    create_scan(client, headers, 0)
+    for seed in range(1, 4):
+        with count_queries() as statements:
+            scan = create_scan(client, headers, seed)
+        assert len(scan["alternatives"]) == 4
+        assert len(statements) == CREATE_QUERIES
+
+
+def test_get_scan_runs_fixed_query_count(client, headers):
+    scan = create_scan(client, headers, 10)
+    with count_queries() as statements:
+        response = client.get(f"/api/scans/{scan['id']}", headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()["alternatives"]) == 4
+    assert len(statements) == GET_QUERIES
+
+
+@pytest.mark.parametrize("scans", [5, 40])
+def test_history_query_count_does_not_grow_with_scans(client, headers, scans):
+    response = client.get("/api/scans/history", params={"limit": 100}, headers=headers)
+    for seed in range(len(response.json()), scans):
+        create_scan(client, headers, 100 + seed)
+    
+    with count_queries() as statements:
+        response = client.get("/api/scans/history", params={"limit": 100}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.json()) == scans
+    assert len(statements) == HISTORY_QUERIES